@@ -15,6 +15,8 @@ get_misjump_target() - generate a random destination up to 36 hexes away.
 from random import randint, choice
 from typing import Tuple, Any, Iterator, Self
 
+MAX_MISJUMP_DISTANCE = 36
+
 class Coordinate:
     """Represents a 3-axis coordinate on a hex grid."""
 
@@ -174,7 +176,7 @@ def create_3_axis(column: int, row: int, sub_x: int, sub_y: int) -> Coordinate:
 
 def get_misjump_target(origin: Coordinate) -> Tuple[Coordinate, int]:
     """Generate a random destination up to 36 hexes away."""
-    distance = randint(1,36)
+    distance = randint(1,MAX_MISJUMP_DISTANCE)
     hexes = [Coordinate(0,distance,-distance),
              Coordinate(0,-distance,distance),
              Coordinate(distance,0,-distance),
@@ -0,0 +1,147 @@
+"""Contains exact probability tables for hyperspace jump outcomes.
+
+The rules in Model._misjump_check(), get_misjump_target() and the
+Ship drive failure checks are all simple dice throws, so their odds
+can be enumerated once and reused rather than sampled. The cached
+tables are returned as read-only mappings, since every caller shares them.
+
+JumpRisk - summary of the outcome probabilities for a single jump.
+
+dice_distribution() - return the probability of each total for count six-sided dice.
+
+chance_to_exceed() - return the probability that a modified dice throw exceeds a target.
+
+misjump_modifier() - return the misjump DM for the given ship state.
+
+misjump_probability() - return the probability of a misjump for the given ship state.
+
+misjump_distance_distribution() - return the probability of each misjump distance.
+
+expected_misjump_distance() - return the expected distance in hexes of a misjump.
+
+pre_jump_failure_probability() - return the probability of drive failure before a jump.
+
+post_jump_failure_probability() - return the probability of drive failure after a jump.
+
+jump_risk() - return a JumpRisk for the given ship state.
+"""
+from fractions import Fraction
+from functools import cache
+from types import MappingProxyType
+from typing import Dict, Mapping
+from src.coordinate import MAX_MISJUMP_DISTANCE
+
+MISJUMP_TARGET = 11
+POST_JUMP_FAILURE_TARGET = 10
+PRE_JUMP_FAILURE_ROLL = 12
+
+class JumpRisk:
+    """Summary of the outcome probabilities for a single jump."""
+
+    def __init__(self, misjump: Fraction, pre_jump_failure: Fraction,
+                 post_jump_failure: Fraction) -> None:
+        """Create an instance of a JumpRisk."""
+        self.misjump = misjump
+        self.pre_jump_failure = pre_jump_failure
+        self.post_jump_failure = post_jump_failure
+
+    def __repr__(self) -> str:
+        """Return the developer string representation of a JumpRisk."""
+        return f"JumpRisk({self.misjump!r}, {self.pre_jump_failure!r}, " +\
+               f"{self.post_jump_failure!r})"
+
+    def __str__(self) -> str:
+        """Return the string representation of a JumpRisk."""
+        return f"Misjump: {float(self.misjump):.2%}\n" +\
+               f"Drive failure before jump: {float(self.pre_jump_failure):.2%}\n" +\
+               f"Drive failure after jump: {float(self.post_jump_failure):.2%}"
+
+    @property
+    def safe_arrival(self) -> Fraction:
+        """Return the probability of jumping and arriving on target without incident."""
+        return ((1 - self.pre_jump_failure) *
+                (1 - self.misjump) *
+                (1 - self.post_jump_failure))
+
+
+@cache
+def dice_distribution(count: int) -> Mapping[int, Fraction]:
+    """Return the probability of each total for count six-sided dice."""
+    distribution: Dict[int, Fraction] = {0: Fraction(1)}
+    for _ in range(count):
+        next_distribution: Dict[int, Fraction] = {}
+        for total, chance in distribution.items():
+            for face in range(1,7):
+                next_distribution[total + face] = (next_distribution.get(total + face, 0) +
+                                                   chance / 6)
+        distribution = next_distribution
+    return MappingProxyType(distribution)
+
+
+@cache
+def chance_to_exceed(count: int, modifier: int, target: int) -> Fraction:
+    """Return the probability that count dice plus modifier exceeds target."""
+    return sum((chance for total, chance in dice_distribution(count).items()
+                if total + modifier > target), Fraction(0))
+
+
+def misjump_modifier(polluted: bool, maintenance_status: str) -> int:
+    """Return the misjump DM for the given ship state."""
+    if polluted:
+        modifier = 3
+    else:
+        modifier = -1
+    if maintenance_status == "red":
+        modifier += 2
+    return modifier
+
+
+def misjump_probability(polluted: bool, maintenance_status: str) -> Fraction:
+    """Return the probability of a misjump for the given ship state."""
+    return chance_to_exceed(2, misjump_modifier(polluted, maintenance_status),
+                            MISJUMP_TARGET)
+
+
+@cache
+def misjump_distance_distribution() -> Mapping[int, Fraction]:
+    """Return the probability of each misjump distance, given a misjump occurs."""
+    return MappingProxyType({distance: Fraction(1, MAX_MISJUMP_DISTANCE)
+                             for distance in range(1, MAX_MISJUMP_DISTANCE + 1)})
+
+
+def expected_misjump_distance() -> Fraction:
+    """Return the expected distance in hexes of a misjump."""
+    return sum((distance * chance for distance, chance
+                in misjump_distance_distribution().items()), Fraction(0))
+
+
+def pre_jump_failure_probability(maintenance_status: str) -> Fraction:
+    """Return the probability of drive failure before a jump."""
+    if maintenance_status != "red":
+        return Fraction(0)
+    return dice_distribution(2)[PRE_JUMP_FAILURE_ROLL]
+
+
+def post_jump_failure_probability(polluted: bool, unrefined_jump_counter: int) -> Fraction:
+    """Return the probability of drive failure after a jump.
+
+    The counter should be the value after the jump has been recorded,
+    matching the order of checks in Model.perform_jump().
+    """
+    if not polluted:
+        return Fraction(0)
+    return chance_to_exceed(2, unrefined_jump_counter, POST_JUMP_FAILURE_TARGET)
+
+
+def jump_risk(polluted: bool, maintenance_status: str,
+              unrefined_jump_counter: int) -> JumpRisk:
+    """Return a JumpRisk for the given ship state.
+
+    The unrefined jump counter is the Ship's current value; the
+    increment applied during a polluted jump is accounted for here.
+    """
+    if polluted:
+        unrefined_jump_counter += 1
+    return JumpRisk(misjump_probability(polluted, maintenance_status),
+                    pre_jump_failure_probability(maintenance_status),
+                    post_jump_failure_probability(polluted, unrefined_jump_counter))
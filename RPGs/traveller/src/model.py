@@ -17,6 +17,7 @@ from src.crew import Crew
 from src.financials import Financials, financials_from
 from src.format import BOLD_RED, BOLD_GREEN, END_FORMAT
 from src.freight import Freight
+from src.jump_odds import JumpRisk, MISJUMP_TARGET, jump_risk, misjump_modifier
 from src.passengers import Passenger, Passage
 from src.ship import Ship, RepairStatus, FuelQuality, ship_from
 from src.star_system import StarSystem, Hex, DeepSpace
@@ -347,15 +348,10 @@ class Model:
 
     def _misjump_check(self, destination: Coordinate, rng=die_roll) -> str:
         """Test for misjump and report results."""
-        if self.tanks_are_polluted():
-            modifier = 3
-        else:
-            modifier = -1
-        if self.maintenance_status() == "red":
-            modifier += 2
+        modifier = misjump_modifier(self.tanks_are_polluted(), self.maintenance_status())
 
         misjump_check = rng(2) + modifier
-        if misjump_check > 11:
+        if misjump_check > MISJUMP_TARGET:
             misjump_target, distance = get_misjump_target(self.coordinate)
 
             self.set_hex(self.get_system_at_coordinate(misjump_target))
@@ -367,6 +363,11 @@ class Model:
         self.set_hex(self.get_system_at_coordinate(destination))
         return f"{BOLD_GREEN}Successful jump to {self.system_name()}.{END_FORMAT}"
 
+    def jump_risk(self) -> JumpRisk:
+        """Return the exact outcome probabilities for a jump in the current ship state."""
+        return jump_risk(self.tanks_are_polluted(), self.maintenance_status(),
+                         self.ship.unrefined_jump_counter)
+
     def perform_jump(self) -> str:
         """Perform a hyperspace jump to the specified destination."""
         self.message_views(self._jump_systems_check())
@@ -13,6 +13,7 @@ from typing import List, Any
 from src.cargo import Cargo
 from src.credits import Credits
 from src.freight import Freight
+from src.jump_odds import PRE_JUMP_FAILURE_ROLL, POST_JUMP_FAILURE_TARGET
 from src.passengers import Passage, Passenger
 from src.star_system import StarSystem
 from src.ship_model import ship_model_from
@@ -338,14 +339,14 @@ class Ship:
 
     def check_failure_pre_jump(self, maintenance_status: str) -> None:
         """Test for drive failure before performing a hyperspace jump."""
-        if (maintenance_status == "red" and die_roll(2) == 12):
+        if (maintenance_status == "red" and die_roll(2) == PRE_JUMP_FAILURE_ROLL):
             self.repair_status = RepairStatus.BROKEN
             self.message_views("Warning: drive failure! Unable to jump.", "red")
 
     def check_failure_post_jump(self) -> None:
         """Test for drive failure after completing a hyperspace jump."""
         if (self.fuel_quality == FuelQuality.UNREFINED and
-            die_roll(2) + self.unrefined_jump_counter > 10):
+            die_roll(2) + self.unrefined_jump_counter > POST_JUMP_FAILURE_TARGET):
             self.repair_status = RepairStatus.BROKEN
             self.message_views("Warning: drive failure!", "red")
 
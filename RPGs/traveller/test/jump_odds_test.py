@@ -0,0 +1,87 @@
+"""Contains tests for the jump_odds module."""
+import unittest
+from fractions import Fraction
+from src.jump_odds import dice_distribution, chance_to_exceed, misjump_modifier
+from src.jump_odds import misjump_probability, misjump_distance_distribution
+from src.jump_odds import expected_misjump_distance, pre_jump_failure_probability
+from src.jump_odds import post_jump_failure_probability, jump_risk
+
+class JumpOddsTestCase(unittest.TestCase):
+    """Tests jump outcome probability functions."""
+
+    def test_dice_distribution(self) -> None:
+        """Test the probability table for a throw of dice."""
+        one_die = dice_distribution(1)
+        self.assertEqual(len(one_die), 6)
+        self.assertEqual(one_die[1], Fraction(1,6))
+
+        two_dice = dice_distribution(2)
+        self.assertEqual(len(two_dice), 11)
+        self.assertEqual(two_dice[2], Fraction(1,36))
+        self.assertEqual(two_dice[7], Fraction(6,36))
+        self.assertEqual(two_dice[12], Fraction(1,36))
+        self.assertEqual(sum(two_dice.values()), 1)
+
+    def test_cached_tables_are_read_only(self) -> None:
+        """Test that callers cannot change the shared probability tables."""
+        two_dice = dice_distribution(2)
+        with self.assertRaises(TypeError):
+            two_dice[7] = Fraction(1)       # type: ignore[index]
+        self.assertEqual(dice_distribution(2)[7], Fraction(6,36))
+
+        distances = misjump_distance_distribution()
+        with self.assertRaises(TypeError):
+            distances[1] = Fraction(1)      # type: ignore[index]
+
+    def test_chance_to_exceed(self) -> None:
+        """Test the probability of a modified throw exceeding a target."""
+        self.assertEqual(chance_to_exceed(2, 0, 11), Fraction(1,36))
+        self.assertEqual(chance_to_exceed(2, 0, 12), 0)
+        self.assertEqual(chance_to_exceed(2, 0, 1), 1)
+        self.assertEqual(chance_to_exceed(2, 3, 11), Fraction(10,36))
+
+    def test_misjump_modifier(self) -> None:
+        """Test the misjump DM for each ship state."""
+        self.assertEqual(misjump_modifier(False, "green"), -1)
+        self.assertEqual(misjump_modifier(False, "red"), 1)
+        self.assertEqual(misjump_modifier(True, "yellow"), 3)
+        self.assertEqual(misjump_modifier(True, "red"), 5)
+
+    def test_misjump_probability(self) -> None:
+        """Test the probability of misjump for each ship state."""
+        self.assertEqual(misjump_probability(False, "green"), 0)
+        self.assertEqual(misjump_probability(False, "red"), Fraction(3,36))
+        self.assertEqual(misjump_probability(True, "green"), Fraction(10,36))
+        self.assertEqual(misjump_probability(True, "red"), Fraction(21,36))
+
+    def test_misjump_distance(self) -> None:
+        """Test the misjump distance table."""
+        distances = misjump_distance_distribution()
+        self.assertEqual(len(distances), 36)
+        self.assertEqual(distances[1], Fraction(1,36))
+        self.assertEqual(sum(distances.values()), 1)
+        self.assertEqual(expected_misjump_distance(), Fraction(37,2))
+
+    def test_drive_failure_probability(self) -> None:
+        """Test the probability of drive failure before and after jump."""
+        self.assertEqual(pre_jump_failure_probability("green"), 0)
+        self.assertEqual(pre_jump_failure_probability("red"), Fraction(1,36))
+
+        self.assertEqual(post_jump_failure_probability(False, 5), 0)
+        self.assertEqual(post_jump_failure_probability(True, 1), Fraction(6,36))
+        self.assertEqual(post_jump_failure_probability(True, 10), 1)
+
+    def test_jump_risk(self) -> None:
+        """Test the summary of jump outcome probabilities."""
+        risk = jump_risk(False, "green", 0)
+        self.assertEqual(risk.misjump, 0)
+        self.assertEqual(risk.pre_jump_failure, 0)
+        self.assertEqual(risk.post_jump_failure, 0)
+        self.assertEqual(risk.safe_arrival, 1)
+
+        risk = jump_risk(True, "red", 0)
+        self.assertEqual(risk.misjump, Fraction(21,36))
+        self.assertEqual(risk.pre_jump_failure, Fraction(1,36))
+        self.assertEqual(risk.post_jump_failure, Fraction(6,36))
+        self.assertEqual(risk.safe_arrival,
+                         Fraction(35,36) * Fraction(15,36) * Fraction(30,36))
@@ -2,8 +2,10 @@
 import unittest
 from test.mock import SystemMock, CalendarMock, CargoDepotMock, FinancialsMock
 from test.mock import ControlsMock
+from fractions import Fraction
 from src.imperial_date import ImperialDate
 from src.model import Model
+from src.ship import Ship, FuelQuality
 
 class ModelTestCase(unittest.TestCase):
     """Tests Model class."""
@@ -88,3 +90,30 @@ class ModelTestCase(unittest.TestCase):
         self.assertEqual(len(ModelTestCase.model.date.observers), 2)
         self.assertTrue(isinstance(ModelTestCase.model.date.observers[0], CargoDepotMock))
         self.assertTrue(isinstance(ModelTestCase.model.date.observers[1], FinancialsMock))
+
+    def test_jump_risk(self) -> None:
+        """Tests the exact jump outcome probabilities for the current ship state."""
+        model = ModelTestCase.model
+        model.ship = Ship("Type A Free Trader")
+        model.financials = FinancialsMock()
+        model.financials.last_maintenance = model.date.current_date
+
+        risk = model.jump_risk()
+        self.assertEqual(risk.misjump, 0)
+        self.assertEqual(risk.pre_jump_failure, 0)
+        self.assertEqual(risk.post_jump_failure, 0)
+        self.assertEqual(risk.safe_arrival, 1)
+
+        model.ship.fuel_quality = FuelQuality.UNREFINED
+        model.ship.unrefined_jump_counter = 2
+        risk = model.jump_risk()
+        self.assertEqual(risk.misjump, Fraction(10,36))
+        self.assertEqual(risk.pre_jump_failure, 0)
+        # the counter goes up to 3 during the jump, so 2D+3 must exceed 10
+        self.assertEqual(risk.post_jump_failure, Fraction(15,36))
+
+        model.financials.last_maintenance = ImperialDate(1,1100)
+        risk = model.jump_risk()
+        self.assertEqual(model.maintenance_status(), "red")
+        self.assertEqual(risk.misjump, Fraction(21,36))
+        self.assertEqual(risk.pre_jump_failure, Fraction(1,36))
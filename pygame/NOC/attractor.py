@@ -1,3 +1,4 @@
+import numpy as np
 from engine import *
 from pvector import PVector
 
@@ -21,6 +22,13 @@ class Attractor:
         force * strength
         return force
 
+    def attract_all(self, locations, mass):
+        # attract() for an (N, 2) array of locations sharing one mass
+        force = (self.location.x, self.location.y) - locations
+        distance = np.clip(np.hypot(force[:, 0], force[:, 1]), 5, 25)
+        strength = (G * self.mass * mass) / (distance * distance)
+        return force * strength[:, np.newaxis]
+
 class Repulsor(Attractor):
     def attract(self, mover):
         force = PVector.sub(self.location, mover.location)
@@ -31,3 +39,6 @@ class Repulsor(Attractor):
         force * strength
         force * -0.1
         return force
+
+    def attract_all(self, locations, mass):
+        return super().attract_all(locations, mass) * -0.1
@@ -1,4 +1,5 @@
 import math
+from functools import cache
 from random import uniform
 import pygame
 from pygame.locals import SRCALPHA
@@ -6,6 +7,15 @@ from pygame import Rect, Surface, transform
 from engine import *
 from pvector import PVector
 
+# every Boid shares one source sprite so the engine's
+# transform cache can reuse rotations across the flock
+@cache
+def boid_surface(width, height, color):
+    surf = Surface((width, height), flags=SRCALPHA)
+    pygame.draw.polygon(surf, color, [(width//2,0), (0,height), (width,height)], 0)
+    pygame.draw.polygon(surf, (0,0,0), [(width//2,0), (0,height), (width,height)], 1)
+    return surf
+
 class Boid:
     def __init__(self, x, y, max_width, max_height):
         self.location = PVector(x,y)
@@ -16,10 +26,8 @@ class Boid:
         self.rect = Rect(x - width/2, y - height/2, width, height)
         self.color = (0, 200, 0)
         
-        self.surf = Surface((self.rect.width, self.rect.height), flags=SRCALPHA)
-        pygame.draw.polygon(self.surf, self.color, [(width//2,0), (0,height), (width,height)], 0)
-        pygame.draw.polygon(self.surf, (0,0,0), [(width//2,0), (0,height), (width,height)], 1)
-        self.original_surf = self.surf.copy()
+        self.original_surf = boid_surface(self.rect.width, self.rect.height, self.color)
+        self.surf = self.original_surf
 
         self.velocity = PVector(0,0)
         self.acceleration = PVector(0,0)
@@ -87,7 +95,7 @@ class Boid:
         return steer
 
     def rotate(self):
-        self.surf = transform.rotate(self.original_surf, -self.angle - 90)
+        self.surf = transforms.rotate(self.original_surf, -self.angle - 90)
         w,h = self.surf.get_size()
         self.rect = Rect(self.location.x-w/2, self.location.y-h/2, w, h)
 
@@ -3,31 +3,96 @@ from random import randint, random, uniform
 from pvector import PVector
 from engine import remap, screen
 
+# bloops have a radius of up to 50, so a query rarely spans more than a few cells
+CELL_SIZE = 50
+
+class SpatialGrid:
+    # uniform grid of cells, each holding the items inside it keyed by id;
+    # items are added, moved and removed one at a time as the world changes
+    def __init__(self, cell_size=CELL_SIZE, locate=lambda item: item):
+        self.cell_size = cell_size
+        self.locate = locate
+        self.cells = {}
+        self.items = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return (item for item, cell in self.items.values())
+
+    def cell(self, location):
+        return (int(location.x // self.cell_size), int(location.y // self.cell_size))
+
+    def add(self, item):
+        cell = self.cell(self.locate(item))
+        self.items[id(item)] = (item, cell)
+        self.cells.setdefault(cell, {})[id(item)] = item
+
+    def remove(self, item):
+        item, cell = self.items.pop(id(item))
+        members = self.cells[cell]
+        del members[id(item)]
+        if not members:
+            del self.cells[cell]
+
+    def move(self, item):
+        cell = self.cell(self.locate(item))
+        if cell != self.items[id(item)][1]:
+            self.remove(item)
+            self.add(item)
+
+    def query(self, location, radius):
+        # items closer than radius to location
+        size = self.cell_size
+        found = []
+        for x in range(int((location.x - radius) // size), int((location.x + radius) // size) + 1):
+            for y in range(int((location.y - radius) // size), int((location.y + radius) // size) + 1):
+                for item in self.cells.get((x, y), {}).values():
+                    if PVector.dist(location, self.locate(item)) < radius:
+                        found.append(item)
+        return found
+
 class World:
     def __init__(self, size, max_width, max_height):
         self.bloops = [Bloop(PVector(randint(0,max_width), 
                                      randint(0,max_height)), 
                                      DNA(), max_width, max_height) for i in range(size)]
-        self.foods = [PVector(uniform(0,max_width), uniform(0,max_height)) for i in range(size*50)]
+        self.foods = SpatialGrid()
+        for i in range(size*50):
+            self.foods.add(PVector(uniform(0,max_width), uniform(0,max_height)))
+
+        self.grid = SpatialGrid(locate=lambda bloop: bloop.location)
+        for b in self.bloops:
+            self.grid.add(b)
+
+    def bloops_near(self, location, radius):
+        return self.grid.query(location, radius)
 
     def update(self):
+        children = []
         for b in self.bloops:
             b.update()
+            self.grid.move(b)
             b.eat(self.foods)
             child = b.reproduce()
             if child is not None:
-                self.bloops.append(child)
-        for i in range(len(self.bloops)-1,-1,-1):
-            if self.bloops[i].is_dead():
-                b = self.bloops[i]
-                self.foods.append(PVector(b.location.x, b.location.y))
-                self.bloops.remove(b)
+                children.append(child)
+                self.grid.add(child)
+
+        living = []
+        for b in self.bloops:
+            if b.is_dead():
+                self.grid.remove(b)
+                self.foods.add(PVector(b.location.x, b.location.y))
+            else:
+                living.append(b)
+        self.bloops = living + children
 
     def draw(self):
         for b in self.bloops:
             b.draw()
-        for f in self.foods:
-            screen.draw.rect((f.x - 3, f.y - 3, 6, 6), (255,0,0), 0)
+        screen.draw.rects([(f.x - 3, f.y - 3, 6, 6) for f in self.foods], (255,0,0))
 
 class DNA:
     def __init__(self):
@@ -83,17 +148,15 @@ class Bloop:
         return self.health < 0.0
 
     def eat(self, foods):
-        for f in foods:
-            d = PVector.dist(self.location, f)
-            if d < self.r:
-                self.health += 100
-                foods.remove(f)
+        for f in foods.query(self.location, self.r):
+            self.health += 100
+            foods.remove(f)
 
     def reproduce(self):
         if random() < 0.01:
             dna = self.dna.copy()
             dna.mutate(0.01)
-            return Bloop(self.location, dna, self.max_width, self.max_height)
+            return Bloop(self.location.copy(), dna, self.max_width, self.max_height)
         else:
             return None
 
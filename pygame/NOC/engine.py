@@ -7,18 +7,31 @@ This module contains the following:
     Painter - methods to draw on the screen.
     Music - wraps the Pygame music mixer.
     Keyboard - holds flags indicating keyboard state.
-    Sounds - wraps the Pygame audio mixer.
+    Mouse - holds flags indicating mouse button state.
+    InputState - tracks pressed, held and released inputs from events.
+    Sounds - provides access to sound files in ./sounds.
     Images - provides access to image files in ./images.
+    AssetGroup - loads a group of assets on first access or in the background.
+    Assets - indexes an asset directory once and caches loaded files by name.
+    Transforms - caches rotated and scaled copies of surfaces.
+    DirtyRects - records the screen areas touched while drawing a frame.
+    Profiler - times each part of the game loop per frame.
+    SpatialHash - buckets Actors into grid cells for collision queries.
 
     screen - singleton instance of Screen for use by game scripts.
     music - singleton instance of Music for use by game scripts.
     keyboard - singleton instance of Keyboard for use by game scripts.
+    mouse - singleton instance of Mouse for use by game scripts.
     keys - contains all keyboard key name constants.
     sounds - singleton instance of Sounds for use by game scripts.
     images - singleton instance of Images for use by game scripts.
+    transforms - singleton instance of Transforms for use by game scripts.
+    profiler - singleton instance of Profiler for use by game scripts.
+    spatial - singleton instance of SpatialHash holding every Actor.
 
     run() - entry point containing the core game loop.
     remap() - utility function; remap a value from one range to another.
+    memory_report() - utility function; memory held by each asset group.
 
 Game scripts should generally import the singleton entries, run(), and Actor. The 
 game loop will expect to find update(), draw(), and the constants WIDTH, HEIGHT, and
@@ -28,39 +41,506 @@ flagging keyboard events in the keyboard object as they occur. The engine will l
 images and sound files in the subdirectories ./images, ./sounds and ./music.
 """
 
-__all__ = ['Actor', 'screen', 'music', 'keyboard', 'keys', 'sounds', 'images', 'run', 'remap', 'lerp']
+__all__ = ['Actor', 'screen', 'music', 'keyboard', 'keys', 'sounds', 'images', 'transforms', 'profiler', 'spatial', 'run', 'remap', 'lerp', 'memory_report']
 __version__ = "1.5"
 
 import os
 import sys
 import math
+import json
+import time
+import weakref
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 import pygame
 import pygame.gfxdraw
 from pygame.locals import *
 
 DEBUG_ACTOR = False
 
-# TO_DO: handle files w/ same name but different extensions
-def _load_image(image_name):
-    """Internal function to handle loading image files in png, jpg or gif formats."""
+FPS = 60
+MAX_STEPS_PER_FRAME = 5
+
+# headless mode needs the SDL dummy drivers selected before pygame.init()
+HEADLESS = os.environ.get('ENGINE_HEADLESS', '') not in ('', '0')
+STEPS = int(os.environ.get('ENGINE_STEPS', 0)) or None
+
+PROFILE = os.environ.get('ENGINE_PROFILE', '')
+PROFILE_FRAMES = 300
+FRAME_BUDGET_MS = 1000 / FPS
+if HEADLESS:
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+IMAGE_EXTENSIONS = ('png', 'jpg', 'gif')
+IMAGE_CACHE_SIZE = 512
+SOUND_EXTENSIONS = ('ogg', 'wav')
+SOUND_CACHE_SIZE = 256
+TEXT_CACHE_SIZE = 256
+SCRATCH_POOL_SIZE = 32
+SPATIAL_CELL_SIZE = 64
+
+class Assets:
+    """Assets - indexes an asset directory once and caches loaded files by name.
+
+    The directory is scanned on first use, and files sharing a name are
+    resolved by the order of the extensions list. Loaded files are held in
+    a least-recently-used cache of at most cache_size entries. Files can be
+    loaded ahead of use by preload(), optionally on a background thread, and
+    sizer, when given, reports the memory held by one loaded file in bytes.
+    """
+
+    def __init__(self, directory, extensions, loader, cache_size=IMAGE_CACHE_SIZE, sizer=None):
+        self.directory = directory
+        self.extensions = extensions
+        self.loader = loader
+        self.cache_size = cache_size
+        self.sizer = sizer
+        self._index = None
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = {}
+            if os.path.isdir(self.directory):
+                for entry in os.listdir(self.directory):
+                    name, extension = os.path.splitext(entry)
+                    extension = extension[1:].lower()
+                    if extension not in self.extensions:
+                        continue
+                    if name in self._index:
+                        current = os.path.splitext(self._index[name])[1][1:].lower()
+                        if self.extensions.index(current) <= self.extensions.index(extension):
+                            continue
+                    self._index[name] = entry
+        return self._index
+
+    def names(self):
+        return list(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def load(self, name):
+        with self._lock:
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                return self._cache[name]
+
+        # decode outside the lock so a background preload doesn't stall the game,
+        # but keep whichever copy was cached first so callers share one object
+        asset = self.loader(os.path.join(self.directory, self.index[name]))
+        with self._lock:
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                return self._cache[name]
+            self._cache[name] = asset
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return asset
+
+    def is_loaded(self, name):
+        return name in self._cache
+
+    def preload(self, names=None, background=False):
+        """Load the named files, or every file, into the cache ahead of use.
+
+        With background=True the files are loaded on a daemon thread, which
+        is returned so the caller can join it or check is_alive().
+        """
+
+        if names is None:
+            names = self.names()
+        names = [name for name in names if name in self.index][:self.cache_size]
+
+        if not background:
+            for name in names:
+                self.load(name)
+            return None
+
+        self._thread = threading.Thread(target=lambda: [self.load(name) for name in names],
+                                        daemon=True)
+        self._thread.start()
+        return self._thread
+
+    @property
+    def preloading(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def memory(self):
+        """Return the number of bytes held by the loaded files."""
+
+        if self.sizer is None:
+            return 0
+        with self._lock:
+            assets = list(self._cache.values())
+        return sum(self.sizer(asset) for asset in assets)
+
+    def report(self):
+        return {'files': len(self.index),
+                'loaded': len(self._cache),
+                'bytes': self.memory()}
+
+    def clear(self):
+        with self._lock:
+            self._index = None
+            self._cache.clear()
+
+
+def _optimize_image(filename):
+    """Internal function to load an image converted to the display pixel format."""
+
+    img = pygame.image.load(filename)
+    if not pygame.display.get_surface():
+        return img
+    if img.get_flags() & SRCALPHA:
+        return img.convert_alpha()
+    return img.convert()
+
 
-    img = None
-    for entry in os.listdir('./images/'):
-        name,extension = entry.split('.')
-        if name == image_name and (extension == 'png' or
-                                   extension == 'jpg' or
-                                   extension == 'gif'):
+def _surface_size(surface):
+    return surface.get_pitch() * surface.get_height()
 
-            try:
-                img = pygame.image.load('./images/' + image_name + '.' + extension)
-            except FileNotFoundError:
-                pass
 
-    if not img:
+def _sound_size(sound):
+    frequency, size, channels = pygame.mixer.get_init()
+    return round(sound.get_length() * frequency) * abs(size) // 8 * channels
+
+
+_image_assets = Assets('./images/', IMAGE_EXTENSIONS, _optimize_image, sizer=_surface_size)
+_sound_assets = Assets('./sounds/', SOUND_EXTENSIONS, pygame.mixer.Sound, SOUND_CACHE_SIZE,
+                       sizer=_sound_size)
+
+def _load_image(image_name):
+    """Internal function to handle loading image files in png, jpg or gif formats."""
+
+    if image_name not in _image_assets:
         print(f"{image_name} not found in ./images or is not an image file.")
         sys.exit()
     else:
-        return img
+        return _image_assets.load(image_name)
+
+
+class Transforms:
+    """Transforms - caches rotated and scaled copies of surfaces.
+
+    Angles and scale factors are quantized to angle_step and scale_step, and
+    each source surface keeps its own least-recently-used cache of at most
+    cache_size variants. Source surfaces are held weakly, so cached variants
+    are released along with their source.
+    """
+
+    def __init__(self, angle_step=1, scale_step=0.01, cache_size=360):
+        self.angle_step = angle_step
+        self.scale_step = scale_step
+        self.cache_size = cache_size
+        self._cache = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def _quantize_angle(self, angle):
+        return (round(angle / self.angle_step) * self.angle_step) % 360
+
+    def _quantize_scale(self, scale):
+        return round(scale / self.scale_step) * self.scale_step
+
+    def _fetch(self, surface, key, transform):
+        variants = self._cache.get(surface)
+        if variants is None:
+            variants = OrderedDict()
+            self._cache[surface] = variants
+
+        if key in variants:
+            self.hits += 1
+            variants.move_to_end(key)
+            return variants[key]
+
+        self.misses += 1
+        result = transform()
+        variants[key] = result
+        if len(variants) > self.cache_size:
+            variants.popitem(last=False)
+        return result
+
+    def rotate(self, surface, angle):
+        angle = self._quantize_angle(angle)
+        return self._fetch(surface, ('rotate', angle),
+                           lambda: pygame.transform.rotate(surface, angle))
+
+    def scale(self, surface, size):
+        size = (max(0, int(size[0])), max(0, int(size[1])))
+        return self._fetch(surface, ('scale', size),
+                           lambda: pygame.transform.scale(surface, size))
+
+    def scale_by(self, surface, factor):
+        factor = self._quantize_scale(factor)
+        width, height = surface.get_size()
+        return self.scale(surface, (width * factor, height * factor))
+
+    def rotozoom(self, surface, angle, scale):
+        angle = self._quantize_angle(angle)
+        scale = self._quantize_scale(scale)
+        return self._fetch(surface, ('rotozoom', angle, scale),
+                           lambda: pygame.transform.rotozoom(surface, angle, scale))
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def clear(self):
+        self._cache = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+
+class Profiler:
+    """Profiler - times each part of the game loop per frame.
+
+    The engine times events, update(), draw() and the display update, and
+    game scripts can add their own nested sections with the timer() context
+    manager. The most recent frames are kept in a ring buffer, which can be
+    drawn as an on-screen graph or exported as CSV or Chrome trace JSON.
+    """
+
+    def __init__(self, size=PROFILE_FRAMES):
+        self.enabled = False
+        self.overlay = False
+        self.frames = deque(maxlen=size)
+        self.frame_count = 0
+        self._origin = time.perf_counter()
+        self._current = None
+        self._stack = []
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._current = {'frame': self.frame_count,
+                         'start': time.perf_counter(),
+                         'sections': {},
+                         'events': []}
+        self._stack = []
+
+    def end_frame(self):
+        if not self._current:
+            return
+        frame = self._current
+        frame['total'] = (time.perf_counter() - frame['start']) * 1000
+        self.frames.append(frame)
+        self.frame_count += 1
+        self._current = None
+
+    @contextmanager
+    def timer(self, name):
+        if not self._current:
+            yield
+            return
+
+        self._stack.append(name)
+        path = '/'.join(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            if self._current:
+                sections = self._current['sections']
+                sections[path] = sections.get(path, 0) + elapsed * 1000
+                self._current['events'].append((path, start, elapsed))
+
+    def section_names(self):
+        names = []
+        for frame in self.frames:
+            for name in frame['sections']:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def export_csv(self, filename):
+        names = self.section_names()
+        with open(filename, 'w') as outfile:
+            outfile.write(','.join(['frame', 'total'] + names) + '\n')
+            for frame in self.frames:
+                row = [str(frame['frame']), f"{frame['total']:.3f}"]
+                row += [f"{frame['sections'].get(name, 0):.3f}" for name in names]
+                outfile.write(','.join(row) + '\n')
+
+    def export_trace(self, filename):
+        events = []
+        for frame in self.frames:
+            events.append({'name': f"frame {frame['frame']}", 'ph': 'X', 'pid': 0, 'tid': 0,
+                           'ts': (frame['start'] - self._origin) * 1e6,
+                           'dur': frame['total'] * 1000})
+            for path, start, elapsed in frame['events']:
+                events.append({'name': path.split('/')[-1], 'cat': path, 'ph': 'X',
+                               'pid': 0, 'tid': 0,
+                               'ts': (start - self._origin) * 1e6,
+                               'dur': elapsed * 1e6})
+        with open(filename, 'w') as outfile:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, outfile)
+
+    def export(self, filename):
+        if filename.endswith('.csv'):
+            self.export_csv(filename)
+        else:
+            self.export_trace(filename)
+
+    def draw(self, surface, height=60, scale=2):
+        """Draw a frame time graph along the bottom of the surface, one pixel per frame."""
+        width = min(len(self.frames), surface.get_width())
+        area = Rect(0, surface.get_height() - height, width, height)
+        if not width:
+            return area
+
+        surface.fill((0,0,0), area)
+        budget_y = area.bottom - FRAME_BUDGET_MS * scale
+        for x, frame in enumerate(list(self.frames)[-width:]):
+            if frame['total'] > FRAME_BUDGET_MS:
+                color = (255,0,0)
+            else:
+                color = (0,255,0)
+            top = max(area.top, area.bottom - frame['total'] * scale)
+            pygame.draw.line(surface, color, (x, area.bottom - 1), (x, top))
+        if budget_y > area.top:
+            pygame.draw.line(surface, (255,255,255), (0, budget_y), (width - 1, budget_y))
+        return area
+
+
+class SpatialHash:
+    """SpatialHash - buckets Actors into grid cells for collision queries.
+
+    Every Actor registers itself here when it is positioned, so queries only
+    test actors sharing a cell with the area of interest instead of scanning
+    every actor in the game. Actors are held weakly and drop out when they
+    are no longer referenced; call remove() to drop one sooner. An actor
+    moved by changing its rect directly must be passed to move() to stay
+    up to date.
+    """
+
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, actor):
+        return id(actor) in self._entries
+
+    def _span(self, rect):
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                max(rect.left, rect.right - 1) // size,
+                max(rect.top, rect.bottom - 1) // size)
+
+    def _cell_keys(self, span):
+        left, top, right, bottom = span
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                yield (x, y)
+
+    def _unlink(self, key, span):
+        for cell in self._cell_keys(span):
+            keys = self._cells.get(cell)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._cells[cell]
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._unlink(key, entry[1])
+
+    def _candidates(self, rect):
+        # dicts rather than sets keep query results in a repeatable order
+        found = {}
+        for cell in self._cell_keys(self._span(rect)):
+            found.update(self._cells.get(cell, {}))
+        for key in found:
+            actor = self._entries[key][0]()
+            if actor is not None:
+                yield actor
+
+    def move(self, actor):
+        key = id(actor)
+        span = self._span(actor.rect)
+        entry = self._entries.get(key)
+        if entry is None:
+            ref = weakref.ref(actor, lambda ref, key=key: self._discard(key))
+        else:
+            ref, old_span = entry
+            if old_span == span:
+                return
+            self._unlink(key, old_span)
+
+        self._entries[key] = (ref, span)
+        for cell in self._cell_keys(span):
+            self._cells.setdefault(cell, {})[key] = None
+
+    def remove(self, actor):
+        self._discard(id(actor))
+
+    def clear(self):
+        self._cells = {}
+        self._entries = {}
+
+    def actors_in_rect(self, rect):
+        rect = Rect(rect)
+        return [actor for actor in self._candidates(rect)
+                if actor.rect.colliderect(rect)]
+
+    def actors_near(self, pos, radius):
+        x, y = pos
+        left, top = math.floor(x - radius), math.floor(y - radius)
+        area = Rect(left, top, math.ceil(x + radius) - left + 1, math.ceil(y + radius) - top + 1)
+
+        near = []
+        for actor in self._candidates(area):
+            rect = actor.rect
+            dx = x - min(max(x, rect.left), rect.right)
+            dy = y - min(max(y, rect.top), rect.bottom)
+            if dx * dx + dy * dy <= radius * radius:
+                near.append(actor)
+        return near
+
+    def collide(self, actors, others):
+        """Return (actor, other) pairs where an actor overlaps one of the others."""
+
+        others = {id(other) for other in others}
+        pairs = []
+        for actor in actors:
+            for other in self._candidates(actor.rect):
+                if (other is not actor and id(other) in others and
+                    actor.rect.colliderect(other.rect)):
+                    pairs.append((actor, other))
+        return pairs
+
+    def collisions(self):
+        """Return every pair of overlapping actors once."""
+
+        seen = set()
+        pairs = []
+        for keys in self._cells.values():
+            if len(keys) < 2:
+                continue
+            cell = [(key, self._entries[key][0]()) for key in keys]
+            for i, (key, actor) in enumerate(cell):
+                for other_key, other in cell[i+1:]:
+                    pair = (key, other_key) if key < other_key else (other_key, key)
+                    if (pair not in seen and actor is not None and other is not None and
+                        actor.rect.colliderect(other.rect)):
+                        seen.add(pair)
+                        pairs.append((actor, other))
+        return pairs
 
 
 class Actor:
@@ -158,6 +638,7 @@ class Actor:
         if DEBUG_ACTOR: print(f"set_x({new_x})")
 
         self.rect.left = new_x - self._anchor_value[0]
+        spatial.move(self)
 
     @property
     def y(self):
@@ -168,6 +649,7 @@ class Actor:
         if DEBUG_ACTOR: print(f"set_y({new_y})")
 
         self.rect.top = new_y - self._anchor_value[1]
+        spatial.move(self)
 
     @property
     def pos(self):
@@ -184,6 +666,7 @@ class Actor:
 
         self.rect.topleft = (new_pos[0] - anchor_x,
                              new_pos[1] - anchor_y)
+        spatial.move(self)
 
     @property
     def anchor(self):
@@ -229,20 +712,103 @@ class Actor:
         return self.rect.center
 
 
-class Images:
+class AssetGroup:
+    """AssetGroup - loads a group of assets on first access or in the background.
+
+    Each file in the group is available as an attribute named after it, and
+    is only loaded when first used. preload() loads a manifest of names ahead
+    of time, for instance on a background thread while a title screen is up,
+    and report() gives the file count, loaded count and bytes held.
+    """
+
+    def __init__(self, assets):
+        self._assets = assets
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self._assets:
+            raise AttributeError(f"no file named {name} in {self._assets.directory}")
+        return self._assets.load(name)
+
+    def __dir__(self):
+        return list(super().__dir__()) + self._assets.names()
+
+    def preload(self, names=None, background=True):
+        return self._assets.preload(names, background)
+
+    @property
+    def preloading(self):
+        return self._assets.preloading
+
+    def report(self):
+        return self._assets.report()
+
+
+class Images(AssetGroup):
     """Images - provides access to image files in ./images."""
 
     def __init__(self):
-        files = []
-        for entry in os.listdir('./images/'):
-            if os.path.isfile('./images/' + entry):
-                name, extension = entry.split('.')
-                if extension == 'png' or extension == 'gif' or extension == 'jpg':
-                    files.append((name,extension))
+        super().__init__(_image_assets)
+
+
+class DirtyRects:
+    """DirtyRects - records the screen areas touched while drawing a frame.
+
+    Only active when run() is invoked with dirty=True. Each frame the areas
+    drawn on the previous frame are restored from the background, and only
+    the merged rectangles from both frames are sent to the display.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.backdrop = Color("white")
+        self.background = None
+        self.rects = []
+        self.previous = []
+
+    def start(self, surface):
+        self.enabled = True
+        self.background = pygame.Surface(surface.get_size())
+        self.redraw_background(surface)
+
+    def set_backdrop(self, surface, backdrop):
+        self.backdrop = backdrop
+        if self.enabled:
+            self.redraw_background(surface)
+
+    def redraw_background(self, surface):
+        if isinstance(self.backdrop, pygame.Surface):
+            self.background.blit(self.backdrop, (0,0))
+        else:
+            self.background.fill(self.backdrop)
+        self.add(surface.blit(self.background, (0,0)))
 
-        for file in files:
-            filename = './images/' + file[0] + '.' + file[1]
-            setattr(self, file[0], pygame.image.load(filename))
+    def add(self, rect):
+        if self.enabled and rect and rect.width > 0 and rect.height > 0:
+            self.rects.append(Rect(rect))
+
+    def erase(self, surface):
+        for rect in self.previous:
+            surface.blit(self.background, rect, rect)
+
+    def flush(self):
+        merged = _merge_rects(self.previous + self.rects)
+        self.previous = self.rects
+        self.rects = []
+        return merged
+
+
+def _merge_rects(rects):
+    """Internal function to combine overlapping rectangles into their unions."""
+
+    merged = []
+    for rect in rects:
+        rect = Rect(rect)
+        i = rect.collidelist(merged)
+        while i != -1:
+            rect.union_ip(merged.pop(i))
+            i = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
 
 
 class Screen:
@@ -251,23 +817,33 @@ class Screen:
     def __init__(self, width, height):
         os.environ['SDL_VIDEO_CENTERED'] = '1'
         self.surface = pygame.display.set_mode((width, height))
-        self.images = {}
         self.draw = Painter(self.surface)
         self.width = width
         self.height = height
 
     def fill(self, color):
-        self.surface.fill(color)
+        _dirty_rects.add(self.surface.fill(color))
 
     def blit(self, image, position, special_flags=0):
         if isinstance(image, pygame.Surface):
             surf = image
         elif isinstance(image, str):
-            if image not in self.images:
-                self.images[image] = _load_image(image)
-            surf = self.images[image]
+            surf = _load_image(image)
+
+        _dirty_rects.add(self.surface.blit(surf, position, special_flags=special_flags))
 
-        self.surface.blit(surf, position, special_flags=special_flags)
+    def blits(self, sequence):
+        """Blit a sequence of (surface, position) pairs in one call."""
+        rects = self.surface.blits(sequence)
+        if _dirty_rects.enabled:
+            for rect in rects:
+                _dirty_rects.add(rect)
+
+    def set_background(self, image):
+        """Set the static background restored under moving objects in dirty mode."""
+        if isinstance(image, str):
+            image = _load_image(image)
+        _dirty_rects.set_backdrop(self.surface, image)
 
 
 class Painter:
@@ -277,19 +853,68 @@ class Painter:
     """
 
     def __init__(self, surface):
-        # TO_DO: make this customizeable 
         self.surface = surface
         self.fontname = None
         self.fontsize = 24
         self.fontcolor = Color('black')    # deprecate
+        self._fonts = {}
+        self._text_cache = OrderedDict()
+        self._scratch_pool = OrderedDict()
         self.set_font()
 
-    def set_font(self):
-        self.font = pygame.font.Font(self.fontname, self.fontsize)
+    def _scratch(self, size, area=None):
+        """Return a reusable per-pixel alpha surface, cleared within area."""
+        size = (max(1, math.ceil(size[0])), max(1, math.ceil(size[1])))
+        if size in self._scratch_pool:
+            self._scratch_pool.move_to_end(size)
+            surf = self._scratch_pool[size]
+        else:
+            surf = pygame.Surface(size, flags=SRCALPHA)
+            self._scratch_pool[size] = surf
+            if len(self._scratch_pool) > SCRATCH_POOL_SIZE:
+                self._scratch_pool.popitem(last=False)
+
+        surf.fill((0,0,0,0), area)
+        return surf
+
+    def set_font(self, fontname=None, fontsize=None):
+        """Set the default font used by text(), keeping current values if omitted."""
+        if fontname is not None:
+            self.fontname = fontname
+        if fontsize is not None:
+            self.fontsize = fontsize
+        self.font = self.get_font(self.fontname, self.fontsize)
+
+    def get_font(self, fontname, fontsize):
+        """Return a Font object, loading each name and size only once."""
+        key = (fontname, fontsize)
+        if key not in self._fonts:
+            self._fonts[key] = pygame.font.Font(fontname, fontsize)
+        return self._fonts[key]
+
+    def render_text(self, text, fontname=None, fontsize=None, color=Color('black'),
+                    antialias=True):
+        """Return a rendered text surface, reusing it while it stays in the cache."""
+        if fontname is None:
+            fontname = self.fontname
+        if fontsize is None:
+            fontsize = self.fontsize
+        key = (text, fontname, fontsize, tuple(Color(color)), antialias)
+
+        if key in self._text_cache:
+            self._text_cache.move_to_end(key)
+            return self._text_cache[key]
+
+        img = self.get_font(fontname, fontsize).render(text, antialias, color)
+        self._text_cache[key] = img
+        if len(self._text_cache) > TEXT_CACHE_SIZE:
+            self._text_cache.popitem(last=False)
+        return img
 
     #TO_DO: only partial positioning implemented thus far, and a bit creaky
     # this is 'borrowed' from ptext, which is what Pygame Zero uses internally
-    def text(self, text, pos=None, center=None, color=Color('black')):
+    def text(self, text, pos=None, center=None, color=Color('black'),
+             fontname=None, fontsize=None, antialias=True):
         if center and not pos:
             x, y = center
             hanchor, vanchor = 0.5, 0.5
@@ -299,7 +924,7 @@ class Painter:
         else:
             raise Exception("Must specify either pos or center location")
 
-        img = self.font.render(text, True, color)
+        img = self.render_text(str(text), fontname, fontsize, color, antialias)
 
         x -= hanchor * img.get_width()
         y -= vanchor * img.get_height()
@@ -308,10 +933,14 @@ class Painter:
         y = int(round(y))
 
         # TO_DO: address duplication with Screen.blit()
-        self.surface.blit(img, (x,y))
+        _dirty_rects.add(self.surface.blit(img, (x,y)))
 
     def line(self, color, start, end, width=1):
-        pygame.draw.line(self.surface, color, start, end, width)
+        _dirty_rects.add(pygame.draw.line(self.surface, color, start, end, width))
+
+    def lines(self, color, points, width=1, closed=False):
+        if len(points) > 1:
+            _dirty_rects.add(pygame.draw.lines(self.surface, color, closed, points, width))
 
     # TO_DO: extend this transparency support to other draw methods
     # TO_DO: transparency/outline fix mutually exclusive, needs adjustment
@@ -321,22 +950,22 @@ class Painter:
             s.set_alpha(color[3])
             #if width == 0:
             s.fill(color)
-            self.surface.blit(s, (rect.x, rect.y))
+            _dirty_rects.add(self.surface.blit(s, (rect.x, rect.y)))
         else:
-            pygame.draw.rect(self.surface, color, rect, width)
+            _dirty_rects.add(pygame.draw.rect(self.surface, color, rect, width))
 
-    # TO_DO: transparency not quite right here, coming out as a square, neds work
     def circle(self, x, y, radius, color, width=0):
         if len(color) == 4:
-            s = pygame.Surface((radius, radius))
-            pygame.draw.circle(s, color, (0, 0), radius, width)
-            s.set_alpha(color[3])
-            self.surface.blit(s, (x, y))
+            r = math.ceil(radius)
+            s = self._scratch((r*2 + 1, r*2 + 1))
+            pygame.draw.circle(s, color, (r, r), radius, width)
+            _dirty_rects.add(self.surface.blit(s, (x - r, y - r)))
         else:
-            pygame.draw.circle(self.surface, color, (x, y), radius, width)
+            _dirty_rects.add(pygame.draw.circle(self.surface, color, (x, y), radius, width))
 
     def pixel(self, x, y, color):
         pygame.gfxdraw.pixel(self.surface, x, y, color)
+        _dirty_rects.add(Rect(x, y, 1, 1))
 
     # this can be generalized to any regular polygon
     # also, doubling sides in the range (but not the angle) and 
@@ -350,14 +979,67 @@ class Painter:
             vY = radius * math.sin(angle) + y
             hex_points.append((vX,vY))
 
-        pygame.draw.polygon(self.surface, color, hex_points, width)
+        _dirty_rects.add(pygame.draw.polygon(self.surface, color, hex_points, width))
 
     def rect(self, x, y, w, h, color, width=0):
-        pygame.draw.rect(self.surface, color, (x, y, w, h), width)
+        if len(color) == 4:
+            s = self._scratch((w, h))
+            pygame.draw.rect(s, color, (0, 0, w, h), width)
+            _dirty_rects.add(self.surface.blit(s, (x, y)))
+        else:
+            _dirty_rects.add(pygame.draw.rect(self.surface, color, (x, y, w, h), width))
+
+    def circles(self, centers, radius, color, width=0):
+        """Draw many circles sharing one color, blitting a single layer when translucent.
+
+        The radius may be a single value or a sequence matching centers.
+        """
+        if not centers:
+            return
+        if isinstance(radius, (int, float)):
+            radius = [radius] * len(centers)
+
+        bounds = [Rect(x - r, y - r, r*2 + 1, r*2 + 1) for (x, y), r in zip(centers, radius)]
+        self._batch(bounds, color, lambda surface:
+                    [pygame.draw.circle(surface, color, center, r, width)
+                     for center, r in zip(centers, radius)])
+
+    def rects(self, rects, color, width=0):
+        """Draw many rectangles sharing one color, blitting a single layer when translucent."""
+        if not rects:
+            return
+
+        bounds = [Rect(rect) for rect in rects]
+        self._batch(bounds, color, lambda surface:
+                    [pygame.draw.rect(surface, color, rect, width) for rect in bounds])
+
+    def _batch(self, bounds, color, draw_shapes):
+        area = bounds[0].unionall(bounds[1:]).clip(self.surface.get_rect())
+        if not area:
+            return
+
+        if len(color) == 4:
+            layer = self._scratch(self.surface.get_size(), area)
+            draw_shapes(layer)
+            _dirty_rects.add(self.surface.blit(layer, area.topleft, area))
+        else:
+            draw_shapes(self.surface)
+            _dirty_rects.add(area)
 
     def polygon(self, points, color, width=0):
-        pygame.draw.polygon(self.surface, color, points, width)
+        _dirty_rects.add(pygame.draw.polygon(self.surface, color, points, width))
 
+    # TO_DO: copied from hex() above, deal with this duplication
+    def triangle(self, x, y, radius, color, width=1):
+        sides = 3
+        tri_points = []
+        for i in range(sides):
+            angle = math.pi * 2/sides * (i+1)
+            vX = radius * math.cos(angle) + x
+            vY = radius * math.sin(angle) + y
+            tri_points.append((vX,vY))
+
+        _dirty_rects.add(pygame.draw.polygon(self.surface, color, tri_points, width))
 
 class Music:
     """Music - wraps the Pygame music mixer."""
@@ -380,20 +1062,141 @@ class Music:
         pygame.mixer.music.fadeout(time)
 
 
-class Keyboard:
-    """Keyboard - holds flags indicating keyboard state."""
+class InputState:
+    """InputState - tracks pressed, held and released inputs from events.
+
+    Reading a flag as an attribute or by index (keyboard.space or
+    keyboard['space']) gives True while the input is held down, or if it was
+    pressed at any point during the current frame. The engine calls
+    consume() after each update(), so every update() sees a press or release
+    once, restore() before draw(), which sees the edges of the whole frame,
+    and end_frame() last. A frame without an update() carries its edges over
+    to the next one. Game scripts driving their own loop can call reset()
+    once a frame instead.
+
+    Transitions can be recorded as a stream of [frame, action, name] entries
+    and played back later, e.g. to drive a game from a benchmark script.
+    """
 
     def __init__(self):
-        self.reset()
+        self._held = set()
+        self._pressed = set()
+        self._released = set()
+        self._seen = (set(), set())
+        self._consumed = False
+        self._frame = 0
+        self._recording = None
+        self._record_start = 0
+        self._playback = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return name in self._held or name in self._pressed
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        elif value:
+            self.press(name)
+        else:
+            self.release(name)
 
-    def reset(self):
-        for i in dir(self):
-            if not i.startswith('__') and i != 'reset':
-                setattr(self, i, False)
+    def __getitem__(self, name):
+        return name in self._held or name in self._pressed
 
-    def __getitem__(self, key):
-        if hasattr(self, key):
-            return getattr(self, key)
+    @property
+    def held(self):
+        return frozenset(self._held)
+
+    @property
+    def pressed(self):
+        return frozenset(self._pressed)
+
+    @property
+    def released(self):
+        return frozenset(self._released)
+
+    def just_pressed(self, name):
+        return name in self._pressed
+
+    def just_released(self, name):
+        return name in self._released
+
+    def press(self, name):
+        if name in self._held:
+            return
+        self._held.add(name)
+        self._pressed.add(name)
+        self._record('press', name)
+
+    def release(self, name):
+        if name not in self._held:
+            return
+        self._held.discard(name)
+        self._released.add(name)
+        self._record('release', name)
+
+    def consume(self):
+        # the edges an update() has seen are set aside for restore()
+        self._seen[0].update(self._pressed)
+        self._seen[1].update(self._released)
+        self._pressed.clear()
+        self._released.clear()
+        self._consumed = True
+
+    def restore(self):
+        self._pressed.update(self._seen[0])
+        self._released.update(self._seen[1])
+
+    def end_frame(self):
+        if self._consumed:
+            self.reset()
+        else:
+            self._advance()
+
+    def reset(self):
+        self._pressed.clear()
+        self._released.clear()
+        self._seen[0].clear()
+        self._seen[1].clear()
+        self._consumed = False
+        self._advance()
+
+    def _advance(self):
+        self._frame += 1
+        self._apply_playback()
+
+    def _record(self, action, name):
+        if self._recording is not None:
+            self._recording.append([self._frame - self._record_start, action, name])
+
+    def start_recording(self):
+        self._recording = []
+        self._record_start = self._frame
+
+    def stop_recording(self):
+        recording = self._recording
+        self._recording = None
+        return recording
+
+    def play(self, stream):
+        """Queue a recorded stream, starting from the current frame."""
+        for frame, action, name in stream:
+            self._playback.setdefault(self._frame + frame, []).append((action, name))
+        self._apply_playback()
+
+    def _apply_playback(self):
+        for action, name in self._playback.pop(self._frame, []):
+            if action == 'press':
+                self.press(name)
+            else:
+                self.release(name)
+
+
+class Keyboard(InputState):
+    """Keyboard - holds flags indicating keyboard state."""
+    pass
 
 
 class keys:
@@ -401,40 +1204,37 @@ class keys:
     pass
 
 
-class Mouse:
+class Mouse(InputState):
     """Mouse - holds flags indicating mouse button state."""
 
-    def __init__(self):
-        self.reset()
+    BUTTONS = {1: 'left', 2: 'middle', 3: 'right'}
 
-    def reset(self):
-        for i in dir(self):
-            if not i.startswith('__') and i != 'reset':
-                setattr(self, i, False)
+    def __init__(self):
+        super().__init__()
+        self._pos = (0,0)
 
-    def __getitem__(self, button):
-        if hasattr(self, button):
-            return getattr(self, button)
+    @property
+    def pos(self):
+        return self._pos
 
 
-class Sounds:
-    """Sounds - wraps the Pygame audio mixer."""
+class Sounds(AssetGroup):
+    """Sounds - provides access to sound files in ./sounds."""
 
     def __init__(self):
-        files = []
-        for entry in os.listdir('./sounds/'):
-            if os.path.isfile('./sounds/' + entry):
-                name, extension = entry.split('.')
-                if extension == 'ogg' or extension == 'wav':
-                    files.append((name,extension))
+        super().__init__(_sound_assets)
+
+
+def memory_report():
+    """Return the loaded file count and bytes held for each asset group."""
 
-        for file in files:
-            filename = './sounds/' + file[0] + '.' + file[1]
-            setattr(self, file[0], pygame.mixer.Sound(filename))
+    return {'images': images.report(), 'sounds': sounds.report()}
 
 
 pygame.init()
 
+_dirty_rects = DirtyRects()
+
 """screen - singleton instance of Screen for use by game scripts."""
 screen = Screen(1,1)
 
@@ -453,22 +1253,119 @@ sounds = Sounds()
 """images - singleton instance of Images for use by game scripts."""
 images = Images()
 
+"""transforms - singleton instance of Transforms for use by game scripts."""
+transforms = Transforms()
+
+"""profiler - singleton instance of Profiler for use by game scripts."""
+profiler = Profiler()
+profiler.enabled = bool(PROFILE)
+
+"""spatial - singleton instance of SpatialHash holding every Actor."""
+spatial = SpatialHash()
+
 # extract all key name constants imported from pygame.locals
 # and expose via fields on keys
 _key_constants = [i for i in dir() if i.startswith('K_')]
 for i in _key_constants:
     const = i[2:].upper()     # remove the initial 'K_'
     setattr(keys, const, const.lower())
-    setattr(keyboard, const.lower(), False)
 
-def run(draw=True):
-    """run() - entry point containing the core game loop."""
+def _key_name(key):
+    """Internal function to convert a Pygame key code to an engine key name."""
+
+    name = pygame.key.name(key)
+    if name.startswith('left') and len(name) > 4:
+        name = 'l' + name[5:]
+    if name.startswith('right') and len(name) > 5:
+        name = 'r' + name[6:]
+
+    if hasattr(keys, name.upper()):
+        return name
+
+def _handle_events():
+    """Internal function to track keyboard and mouse events, returning False on quit."""
+
+    running = True
+    for event in pygame.event.get():
+        if event.type == QUIT:
+            running = False
+
+        elif event.type == KEYDOWN:
+            if event.key == K_q:
+                running = False
+
+            name = _key_name(event.key)
+            if name:
+                keyboard.press(name)
+
+        elif event.type == KEYUP:
+            name = _key_name(event.key)
+            if name:
+                keyboard.release(name)
+
+        elif event.type == MOUSEBUTTONDOWN and event.button in Mouse.BUTTONS:
+            mouse._pos = event.pos
+            mouse.press(Mouse.BUTTONS[event.button])
+
+        elif event.type == MOUSEBUTTONUP and event.button in Mouse.BUTTONS:
+            mouse._pos = event.pos
+            mouse.release(Mouse.BUTTONS[event.button])
+
+        elif event.type == MOUSEMOTION:
+            mouse._pos = event.pos
+    return running
+
+def _use_dummy_drivers():
+    # pygame.init() has already run at import, so restart the display and
+    # mixer if they were opened on real devices
+    if pygame.display.get_driver() != 'dummy':
+        pygame.display.quit()
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        pygame.display.init()
+        # the old display surface is gone; game scripts hold this same object
+        screen.__init__(1, 1)
+    if os.environ.get('SDL_AUDIODRIVER') != 'dummy':
+        pygame.mixer.quit()
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+        try:
+            pygame.mixer.init()
+        except pygame.error:
+            pass
+
+def run(draw=True, dirty=False, timestep=None, headless=HEADLESS, render_every=1, steps=STEPS):
+    """run() - entry point containing the core game loop.
+
+    With dirty=True only the screen areas drawn through Screen and Painter
+    are erased and updated each frame, rather than the whole display. Game
+    scripts can set a static backdrop once with screen.set_background().
+
+    With a timestep (in seconds), update() is always passed that dt and is
+    called as many times as real elapsed time requires, up to
+    MAX_STEPS_PER_FRAME, with draw() called once per frame.
+
+    With headless=True (the default when ENGINE_HEADLESS is set in the
+    environment) the loop does not wait on the clock or update the display,
+    runs update() as fast as possible with a fixed dt, and only calls draw()
+    every render_every steps (never if 0). The loop ends on quit, or once
+    update() has been called steps times (ENGINE_STEPS in the environment).
+    Passing headless=True switches the display and audio to the SDL dummy
+    drivers if they weren't already selected through ENGINE_HEADLESS, so no
+    window is opened.
+
+    Setting ENGINE_PROFILE enables the profiler; if its value is a .csv or
+    .json filename, the recorded frames are written there on exit.
+    """
 
     #sys.setprofile(_trace_function)
+    if headless:
+        _use_dummy_drivers()
+
     parent = sys.modules['__main__']
     parent.screen = Screen(parent.WIDTH, parent.HEIGHT)
     pygame.display.set_caption(parent.TITLE)
-    pygame.key.set_repeat(10,10)
+
+    if dirty:
+        _dirty_rects.start(parent.screen.surface)
 
     if not draw:
         screen.fill(Color("white"))
@@ -480,35 +1377,76 @@ def run(draw=True):
     else:
         update = lambda dt: up(dt)
 
+    if headless and timestep is None:
+        timestep = 1 / FPS
+
     clock = pygame.time.Clock()
+    lag = 0.0
+    step_count = 0
     running = True
     while running:
-        clock.tick(60)
-        keyboard.reset()
-        for event in pygame.event.get():
-            if event.type == QUIT:
-                running = False
-
-            if event.type == KEYDOWN:
-                if event.key == K_q:
-                    running = False
-
-                name = pygame.key.name(event.key)
-                if name.startswith('left') and len(name) > 4:
-                    name = 'l' + name[5:]
-                if name.startswith('right') and len(name) > 5:
-                    name = 'r' + name[6:]
-
-                if hasattr(keys, name.upper()):
-                    setattr(keyboard, name, True)
-    
-        if draw:
+        if not headless:
+            clock.tick(FPS)
+
+        profiler.begin_frame()
+        with profiler.timer('events'):
+            running = _handle_events()
+
+        if headless:
+            dts = [timestep]
+            rendering = draw and render_every > 0 and step_count % render_every == 0
+        elif timestep is None:
+            dts = [clock.get_time() / 1000]
+            rendering = draw
+        else:
+            lag += clock.get_time() / 1000
+            count = min(int(lag // timestep), MAX_STEPS_PER_FRAME)
+            lag = min(lag - count * timestep, timestep)
+            dts = [timestep] * count
+            rendering = draw
+
+        if steps is not None:
+            dts = dts[:steps - step_count]
+
+        if rendering and dirty:
+            _dirty_rects.erase(screen.surface)
+        elif rendering:
             screen.fill(Color("white"))
-        update(pygame.time.Clock.get_time(clock)/1000)
-        if draw:
-            parent.draw()
-        pygame.display.update()
-    
+
+        # each update() sees an input edge once, and draw() sees every edge
+        # of the frame; a frame with no update() carries its edges over
+        for dt in dts:
+            with profiler.timer('update'):
+                update(dt)
+            keyboard.consume()
+            mouse.consume()
+        step_count += len(dts)
+        keyboard.restore()
+        mouse.restore()
+
+        if rendering:
+            with profiler.timer('draw'):
+                parent.draw()
+            if profiler.overlay:
+                _dirty_rects.add(profiler.draw(screen.surface))
+        with profiler.timer('display'):
+            if not headless:
+                if dirty:
+                    pygame.display.update(_dirty_rects.flush())
+                else:
+                    pygame.display.update()
+            elif rendering and dirty:
+                _dirty_rects.flush()
+
+        keyboard.end_frame()
+        mouse.end_frame()
+        profiler.end_frame()
+
+        if steps is not None and step_count >= steps:
+            running = False
+
+    if PROFILE.endswith(('.csv', '.json')):
+        profiler.export(PROFILE)
     pygame.quit()
 
 def remap(old_val, old_min, old_max, new_min, new_max):
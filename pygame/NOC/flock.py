@@ -1,41 +1,174 @@
 from random import randint
-from boids import Boid
+import numpy as np
+import pygame
+from engine import *
+from pvector import VectorArray
+from boids import Boid, boid_surface
+
+# the grid resolution should be at least the largest neighbor distance a boid
+# looks at (50 for align and cohesion), so its 3x3 block of cells holds every
+# boid it can see
 
 class Flock:
     def __init__(self, max_width, max_height, resolution, boid_count):
-        self.grid = [[[] for i in range(max_width//resolution)] for i in range(max_height//resolution)]
-        self.max_width = len(self.grid[0])-1
-        self.max_height = len(self.grid)-1
         self.resolution = resolution
 
         self.boids = []
         for i in range(boid_count):
             self.add_boid(Boid(max_width//2 + randint(-1,1), max_height//2 + randint(-1,1), max_width, max_height))
 
+    def cell(self, boid):
+        return (int(boid.location.x) // self.resolution, int(boid.location.y) // self.resolution)
+
+    def build_grid(self):
+        # rebuilt every frame, which is cheaper than moving boids between cells
+        grid = {}
+        for b in self.boids:
+            grid.setdefault(self.cell(b), []).append(b)
+        return grid
+
+    def neighbors(self, grid, boid):
+        x, y = self.cell(boid)
+        nearby = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                nearby.extend(grid.get((x + dx, y + dy), ()))
+        return nearby
+
     def run(self):
+        grid = self.build_grid()
         for b in self.boids:
-            prev_column = int(b.location.y) // self.resolution
-            prev_column = max(0, min(prev_column, self.max_height))
-            prev_row = int(b.location.x) // self.resolution
-            prev_row = max(0, min(prev_row, self.max_width))
-            if b not in self.grid[prev_column][prev_row]:
-                self.grid[prev_column][prev_row].append(b)
-
-            b.flock(self.grid[prev_column][prev_row])
+            b.flock(self.neighbors(grid, b))
             b.update()
 
-            new_column = int(b.location.y) // self.resolution
-            new_column = max(0, min(new_column, self.max_height))
-            new_row = int(b.location.x) // self.resolution
-            new_row = max(0, min(new_row, self.max_width))
-            if new_column != prev_column or new_row != prev_row:
-                if b not in self.grid[new_column][new_row]:
-                    self.grid[new_column][new_row].append(b)
-                self.grid[prev_column][prev_row].remove(b)
-
     def add_boid(self, boid):
         self.boids.append(boid)
 
     def draw(self):
         for b in self.boids:
             b.draw()
+
+class VectorFlock:
+    # the same rules as Boid, computed for the whole flock at once with NumPy
+    def __init__(self, max_width, max_height, resolution, boid_count):
+        self.resolution = resolution
+        self.count = boid_count
+
+        start = np.random.randint(-1, 2, (boid_count, 2)) + (max_width//2, max_height//2)
+        self.location = VectorArray(xy=start)
+        self.velocity = VectorArray(boid_count)
+        self.angle = np.zeros(boid_count)
+
+        self.r = 10.0
+        self.max_speed = 4
+        self.max_force = 0.1
+        self.neighbor_dist = 50
+
+        self.surf = boid_surface(20, 25, (0, 200, 0))
+
+    def pairs(self):
+        # each pair of boids sharing a 3x3 block of grid cells, listed once: a
+        # boid is paired with the boids after it in its own cell and with
+        # those in the four cells ahead of it, found by sorting boids by cell
+        cells = np.floor(self.location.xy / self.resolution).astype(np.int64)
+        cells -= cells.min(axis=0)
+        span = cells[:, 1].max() + 3
+        key = (cells[:, 0] + 1) * span + cells[:, 1] + 1
+
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+        counts = np.bincount(key, minlength=(cells[:, 0].max() + 3) * span)
+        starts = np.cumsum(counts) - counts
+        ranks = np.arange(self.count)
+
+        first, second = [], []
+        for neighbor, begin in ((key, ranks + 1),
+                                (key + span - 1, None), (key + span, None),
+                                (key + span + 1, None), (key + 1, None)):
+            if begin is None:
+                begin = starts[neighbor]
+                n = counts[neighbor]
+            else:
+                n = starts[key] + counts[key] - begin
+            total = n.sum()
+            if total == 0:
+                continue
+            within = np.arange(total) - np.repeat(np.cumsum(n) - n, n)
+            first.append(np.repeat(ranks, n))
+            second.append(np.repeat(begin, n) + within)
+
+        if not first:
+            return ranks[:0], ranks[:0]
+        return order[np.concatenate(first)], order[np.concatenate(second)]
+
+    def accumulate(self, i, j, to_i, to_j):
+        # sum per boid of the values each pair contributes to either end
+        return np.bincount(np.concatenate((i, j)), np.concatenate((to_i, to_j)), self.count)
+
+    def steer(self, desired):
+        steer = VectorArray.sub(desired, self.velocity)
+        return steer.limit(self.max_force)
+
+    def seek(self, target):
+        d = VectorArray.sub(target, self.location)
+        distance = d.mag()
+        speed = np.where(distance < 100, distance / 100 * self.max_speed, self.max_speed)
+        desired = VectorArray.normalize(d) * speed
+        return self.steer(desired)
+
+    def run(self):
+        n = self.count
+        x, y = self.location.x, self.location.y
+        vx, vy = self.velocity.x, self.velocity.y
+
+        # keep only the pairs within sight before doing any per pair work
+        i, j = self.pairs()
+        dx = x[i] - x[j]
+        dy = y[i] - y[j]
+        d_sq = dx * dx + dy * dy
+        near = (d_sq > 0) & (d_sq < self.neighbor_dist ** 2)
+        i, j, dx, dy, d_sq = i[near], j[near], dx[near], dy[near], d_sq[near]
+        near_count = np.bincount(np.concatenate((i, j)), minlength=n)
+
+        # the direction away from each close neighbor, divided by the distance
+        weight = (d_sq < (self.r * 2) ** 2) / d_sq
+        close_count = self.accumulate(i, j, weight > 0, weight > 0)
+        away = np.column_stack((self.accumulate(i, j, dx * weight, -dx * weight),
+                                self.accumulate(i, j, dy * weight, -dy * weight)))
+        separate = self.steer(VectorArray(xy=away).set_mag(self.max_speed))
+        separate.xy[close_count == 0] = 0
+
+        heading = np.column_stack((self.accumulate(i, j, vx[j], vx[i]),
+                                   self.accumulate(i, j, vy[j], vy[i])))
+        align = self.steer(VectorArray(xy=heading).set_mag(self.max_speed))
+        align.xy[near_count == 0] = 0
+
+        center = np.column_stack((self.accumulate(i, j, x[j], x[i]),
+                                  self.accumulate(i, j, y[j], y[i])))
+        center /= np.maximum(near_count, 1)[:, np.newaxis]
+        cohesion = self.seek(VectorArray(xy=center))
+        cohesion.xy[near_count == 0] = 0
+
+        location = self.location.xy
+        mouse = pygame.mouse.get_pos()
+        seek = self.seek(VectorArray(xy=np.broadcast_to(mouse, location.shape)))
+
+        acceleration = separate * 2.5 + align + cohesion + seek * 1.5
+        self.velocity + acceleration
+        self.velocity.limit(self.max_speed)
+        self.location + self.velocity
+
+        # turn each sprite 3 degrees a frame towards the mouse
+        to_mouse = VectorArray(xy=np.subtract(mouse, location))
+        target_angle = to_mouse.heading() % 360
+        previous = self.angle % 360
+        delta = (target_angle - previous + 180) % 360 - 180
+        self.angle = previous + np.where(delta > 1, 3, np.where(delta < -1, -3, 0))
+
+    def draw(self):
+        sprites = []
+        for (x, y), angle in zip(self.location.xy.tolist(), self.angle.tolist()):
+            surf = transforms.rotate(self.surf, -angle - 90)
+            w, h = surf.get_size()
+            sprites.append((surf, (x - w/2, y - h/2)))
+        screen.blits(sprites)
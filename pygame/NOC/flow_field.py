@@ -1,6 +1,35 @@
+import numpy as np
+import pygame
+from pygame import Surface
+from pygame.locals import SRCALPHA
 from engine import *
 from pvector import PVector
 
+def fade(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+def perlin(x, y, seed=None):
+    # 2D gradient noise in roughly -1..1 for arrays of coordinates
+    rng = np.random.default_rng(seed)
+    permutation = rng.permutation(256)
+    permutation = np.concatenate((permutation, permutation))
+    angles = rng.uniform(0, 2 * np.pi, 256)
+    gradients = np.column_stack((np.cos(angles), np.sin(angles)))
+
+    x0, y0 = np.floor(x).astype(int), np.floor(y).astype(int)
+    fx, fy = x - x0, y - y0
+    x0 &= 255
+    y0 &= 255
+
+    def corner(dx, dy):
+        g = gradients[permutation[permutation[x0 + dx] + y0 + dy]]
+        return g[..., 0] * (fx - dx) + g[..., 1] * (fy - dy)
+
+    u, v = fade(fx), fade(fy)
+    top = corner(0, 0) + u * (corner(1, 0) - corner(0, 0))
+    bottom = corner(0, 1) + u * (corner(1, 1) - corner(0, 1))
+    return (top + v * (bottom - top)) * np.sqrt(2)
+
 class FlowField:
     def __init__(self, resolution, max_width, max_height):
         self.resolution = resolution
@@ -8,35 +37,67 @@ class FlowField:
         self.max_height = max_height
         self.cols = max_width//resolution
         self.rows = max_height//resolution
-        self.field = [[self.make_vector(i,j) for i in range(self.cols)] for j in range(self.rows)]
 
-    def make_vector(self, col, row):
-        center = (self.resolution * col + self.resolution//2, 
-                  self.resolution * row + self.resolution//2)
-        v = PVector.sub(PVector(self.max_width//2, self.max_height//2), PVector(*center))
-        return PVector.normalize(v)
+        # field[row, col] is the unit vector for that cell
+        self.field = np.zeros((self.rows, self.cols, 2))
+        self.surface = None
+        self.point_at(max_width//2, max_height//2)
 
-    def draw(self):
-        for x in range(self.cols):
-            for y in range(self.rows):
-                self.draw_cell(y,x)
+    def centers(self):
+        col, row = np.meshgrid(np.arange(self.cols), np.arange(self.rows))
+        return np.stack((col, row), axis=-1) * self.resolution + self.resolution//2
 
-    def draw_cell(self, x, y):
-        top = self.resolution * y
-        left = self.resolution * x
-        width = self.resolution
-        height = self.resolution
+    def set_field(self, field):
+        length = np.hypot(field[..., 0], field[..., 1])[..., np.newaxis]
+        self.field = np.divide(field, length, out=np.zeros_like(field), where=length != 0)
+        self.surface = None
 
-        fill = 1
+    def point_at(self, x, y):
+        self.set_field(np.subtract((x, y), self.centers()).astype(float))
 
-        center = (top + self.resolution//2, left + self.resolution//2)
-        end = (center[0] + self.field[x][y].x * 20, center[1] + self.field[x][y].y * 20)
+    def from_noise(self, scale=0.1, seed=None):
+        col, row = np.meshgrid(np.arange(self.cols), np.arange(self.rows))
+        theta = perlin(col * scale, row * scale, seed) * 2 * np.pi
+        self.set_field(np.stack((np.cos(theta), np.sin(theta)), axis=-1))
 
-        screen.draw.rect((top, left, width, height), (255,64,64), fill)
-        screen.draw.circle(center[0], center[1], 3, (0,0,0))
-        screen.draw.line((0,0,0), center, end)
+    def draw(self):
+        # the field only changes when it is regenerated, so draw it once
+        if self.surface is None:
+            self.surface = self.render()
+        screen.blit(self.surface, (0, 0))
+
+    def render(self):
+        surface = Surface((self.max_width, self.max_height), flags=SRCALPHA)
+        centers = self.centers().reshape(-1, 2).tolist()
+        ends = (self.centers() + self.field * 20).reshape(-1, 2).tolist()
+        for (x, y), end in zip(centers, ends):
+            left, top = x - self.resolution//2, y - self.resolution//2
+            pygame.draw.rect(surface, (255,64,64), (left, top, self.resolution, self.resolution), 1)
+            pygame.draw.circle(surface, (0,0,0), (x, y), 3)
+            pygame.draw.line(surface, (0,0,0), (x, y), end)
+        return surface
 
     def lookup(self, vector):
-        column = max(min(vector.x//self.resolution, self.cols), 0)
-        row = max(min(vector.y//self.resolution, self.rows), 0)
-        return self.field[row][column]
+        column = max(min(int(vector.x)//self.resolution, self.cols - 1), 0)
+        row = max(min(int(vector.y)//self.resolution, self.rows - 1), 0)
+        return PVector(*self.field[row, column].tolist())
+
+    def lookup_many(self, points):
+        # bilinear blend of the four cell vectors around each point, for an
+        # (N, 2) array or a VectorArray of locations
+        points = getattr(points, 'xy', points)
+        grid = np.asarray(points, dtype=float) / self.resolution - 0.5
+        x = np.clip(grid[:, 0], 0, self.cols - 1)
+        y = np.clip(grid[:, 1], 0, self.rows - 1)
+
+        col = np.minimum(x.astype(int), max(self.cols - 2, 0))
+        row = np.minimum(y.astype(int), max(self.rows - 2, 0))
+        next_col = np.minimum(col + 1, self.cols - 1)
+        next_row = np.minimum(row + 1, self.rows - 1)
+        u = (x - col)[:, np.newaxis]
+        v = (y - row)[:, np.newaxis]
+
+        field = self.field
+        top = field[row, col] * (1 - u) + field[row, next_col] * u
+        bottom = field[next_row, col] * (1 - u) + field[next_row, next_col] * u
+        return top * (1 - v) + bottom * v
@@ -1,73 +1,178 @@
 import math
-from random import uniform, randint
-from engine import screen
-from pvector import PVector
-from screen_matrix import line, translate, rotate, push_matrix, pop_matrix
+from collections import OrderedDict
+from functools import lru_cache
+from random import Random
+import numpy as np
+import pygame
+from pygame import Surface
+from pygame.locals import SRCALPHA
+from engine import screen, transforms
+from screen_matrix import sm
+
+# the geometry of each fractal is generated level by level into flat
+# arrays, and the static ones are drawn once to a surface cached by their
+# parameters, so drawing them every frame is a single blit
+
+# how many fractals of each kind keep their geometry or surface cached
+FRACTAL_CACHE_SIZE = 32
+
+def prerender(points, draw):
+    # draw onto a transparent surface just big enough for the points, moved
+    # by whole pixels so the result matches drawing straight to the screen
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    left, top = np.floor(points.min(axis=0)).astype(int) - 2
+    right, bottom = np.ceil(points.max(axis=0)).astype(int) + 2
+    surface = Surface((right - left, bottom - top), flags=SRCALPHA)
+    draw(surface, (left, top))
+    return surface, (left, top)
+
+def circle_centers(x, y, radius):
+    # rows of (x, y, radius), each level splitting every circle into four
+    circles = []
+    level = np.array([(x, y, radius)], dtype=float)
+    while len(level):
+        circles.append(level)
+        level = level[level[:, 2] > 2]
+        half = level[:, 2:3] / 2
+        level = np.concatenate([np.hstack((level[:, :2] + half * offset, half))
+                                for offset in ((1, 0), (-1, 0), (0, 1), (0, -1))])
+    return np.concatenate(circles)
+
+@lru_cache(maxsize=FRACTAL_CACHE_SIZE)
+def circle_surface(x, y, radius):
+    circles = circle_centers(x, y, radius)
+    def draw(surface, offset):
+        for cx, cy, r in (circles - (*offset, 0)).tolist():
+            pygame.draw.circle(surface, (0,0,0), (cx, cy), r, 1)
+    return prerender(((x - radius, y - radius), (x + radius, y + radius)), draw)
 
 def draw_circle(x, y, radius):
-    screen.draw.circle(x, y, radius, (0,0,0), 1)
-    if radius > 2:
-        draw_circle(x + radius/2, y, radius/2)
-        draw_circle(x - radius/2, y, radius/2)
-        draw_circle(x, y + radius/2, radius/2)
-        draw_circle(x, y - radius/2, radius/2)
+    screen.blit(*circle_surface(x, y, radius))
+
+def cantor_segments(x, y, l):
+    # rows of (x1, y, x2), one level of the set 20 pixels below the last
+    segments = []
+    starts = np.array([x], dtype=float)
+    while l >= 1:
+        segments.append(np.column_stack((starts, np.full(len(starts), y), starts + l)))
+        starts = np.concatenate((starts, starts + l * 2/3))
+        y += 20
+        l /= 3
+    return np.concatenate(segments) if segments else np.empty((0, 3))
+
+@lru_cache(maxsize=FRACTAL_CACHE_SIZE)
+def cantor_surface(x, y, l):
+    segments = cantor_segments(x, y, l)
+    def draw(surface, offset):
+        left, top = offset
+        for x1, y1, x2 in segments.tolist():
+            pygame.draw.line(surface, (0,0,0), (x1 - left, y1 - top), (x2 - left, y1 - top))
+    return prerender(segments[:, [0, 1, 2, 1]], draw)
 
 def cantor(x, y, l):
     if l >= 1:
-        screen.draw.line((0,0,0), (x,y), (x+l,y))
-        y += 20
-        cantor(x, y, l/3)
-        cantor(x + l * 2/3, y, l/3)
-
-def branch(length):
-    line(0, 0, 0, -length)
-    translate(0, -length)
-
-    length *= 0.66
-
-    if length > 2:
-        n = randint(1,4)
-        for i in range(n):
-            theta = uniform(-math.pi/2,math.pi/2)
-            push_matrix()
-            rotate(theta)
-            branch(length)
-            pop_matrix()
-
-class KochLine:
-    def __init__(self, a, b):
-        self.start = a.copy()
-        self.end = b.copy()
-
-    def draw(self):
-        screen.draw.line((0,0,0), (self.start.x, self.start.y), (self.end.x, self.end.y))
-
-    def koch_a(self):
-        return self.start.copy()
-
-    def koch_b(self):
-        v = PVector.sub(self.end, self.start)
-        v / 3
-        return PVector.add(self.start, v)
-
-    def koch_c(self):
-        v = PVector.sub(self.end, self.start)
-        v / 3
-        a = PVector.add(self.start, v)
-        if self.end.x < self.start.x:
-            v.rotate(120)
-        else:
-            v.rotate(-60)
-        return PVector.add(a,v)
-
-    def koch_d(self):
-        v = PVector.sub(self.end, self.start)
-        v * 2
-        v / 3
-        return PVector.add(self.start, v)
-
-    def koch_e(self):
-        return self.end.copy()
+        screen.blit(*cantor_surface(x, y, l))
+
+def grow_branches(length, rng):
+    # an (N, 2, 2) array of the tree's branches, growing up from (0, 0)
+    segments = []
+    stack = [(0.0, 0.0, 0.0, length)]
+    while stack:
+        x, y, angle, length = stack.pop()
+        tip_x = x + length * math.sin(angle)
+        tip_y = y - length * math.cos(angle)
+        segments.append(((x, y), (tip_x, tip_y)))
+
+        length *= 0.66
+        if length > 2:
+            for i in range(rng.randint(1,4)):
+                stack.append((tip_x, tip_y, angle + rng.uniform(-math.pi/2,math.pi/2), length))
+    return np.array(segments)
+
+@lru_cache(maxsize=FRACTAL_CACHE_SIZE)
+def seeded_branches(length, seed):
+    return grow_branches(length, Random(seed))
+
+def branch_segments(length, seed=None):
+    # trees with a seed are kept, and without one a new tree is grown each call
+    if seed is None:
+        return grow_branches(length, Random())
+    return seeded_branches(length, seed)
+
+@lru_cache(maxsize=FRACTAL_CACHE_SIZE)
+def branch_surface(length, seed, color):
+    # drawn untransformed, the screen matrix is applied when it is blitted
+    points = branch_segments(length, seed).reshape(-1, 2)
+    def draw(surface, offset):
+        ends = (points - offset).reshape(-1, 2, 2).tolist()
+        for start, end in ends:
+            pygame.draw.line(surface, color, start, end)
+    return prerender(points, draw)
+
+def branch(length, seed=None):
+    # drawn through the current screen matrix, from its origin upwards
+    (a, c, e), (b, d, f) = sm.matrix[:2].tolist()
+    if seed is not None and a*d - b*c > 0 and math.isclose(a, d) and math.isclose(b, -c):
+        surface, (left, top) = branch_surface(length, seed, sm.color)
+        if (a, b) == (1, 0):
+            screen.blit(surface, (round(left + e), round(top + f)))
+            return
+
+        # rotate and scale the surface about its center, then line the
+        # tree's origin up with the matrix origin
+        w, h = surface.get_size()
+        vx, vy = -left - w/2, -top - h/2
+        turned = transforms.rotozoom(surface, -math.degrees(math.atan2(b, a)), math.hypot(a, b))
+        tw, th = turned.get_size()
+        screen.blit(turned, (round(e - (a*vx + c*vy) - tw/2), round(f - (b*vx + d*vy) - th/2)))
+        return
+
+    points = sm.transform(branch_segments(length, seed)).reshape(-1, 2, 2).tolist()
+    for start, end in points:
+        screen.draw.line(sm.color, start, end)
+
+def tree(length, seed=None):
+    # kept for existing callers; branch() now maps the whole tree through
+    # the screen matrix in one pass, so no batch() is needed around it
+    branch(length, seed)
+
+def koch_step(points):
+    # replace each segment of the polyline with the four segments of the next level
+    start, end = points[:-1], points[1:]
+    v = (end - start) / 3
+    b = start + v
+    d = start + v * 2
+
+    # v turned by -60 degrees, or 120 when the segment runs right to left
+    theta = np.radians(np.where(end[:, 0] < start[:, 0], 120, -60))
+    cos, sin = np.cos(theta), np.sin(theta)
+    c = b + np.column_stack((v[:, 0] * cos - v[:, 1] * sin, v[:, 0] * sin + v[:, 1] * cos))
+
+    next_points = np.stack((start, b, c, d), axis=1).reshape(-1, 2)
+    return np.concatenate((next_points, points[-1:]))
+
+# the levels of the most recent Koch curves generated so far, keyed by their end points
+_koch_levels = OrderedDict()
+
+def koch_points(start, end, depth):
+    key = (start, end)
+    if key in _koch_levels:
+        _koch_levels.move_to_end(key)
+    else:
+        _koch_levels[key] = [np.array((start, end), dtype=float)]
+        if len(_koch_levels) > FRACTAL_CACHE_SIZE:
+            _koch_levels.popitem(last=False)
+    levels = _koch_levels[key]
+    while len(levels) <= depth:
+        levels.append(koch_step(levels[-1]))
+    return levels[depth]
+
+@lru_cache(maxsize=FRACTAL_CACHE_SIZE)
+def koch_surface(start, end, depth):
+    points = koch_points(start, end, depth)
+    def draw(surface, offset):
+        pygame.draw.lines(surface, (0,0,0), False, (points - offset).tolist())
+    return prerender(points, draw)
 
 class KochCurve:
     def __init__(self, start, end, depth):
@@ -75,28 +180,13 @@ class KochCurve:
         self.end = end
         self.depth = depth
 
-        self.lines = []
-        self.lines.append(KochLine(self.start, self.end))
-        for i in range(self.depth):
-            self.generate()
+    @property
+    def points(self):
+        return koch_points((self.start.x, self.start.y), (self.end.x, self.end.y), self.depth)
 
     def generate(self):
-        next_lines = []
-
-        for kl in self.lines:
-            a = kl.koch_a()
-            b = kl.koch_b()
-            c = kl.koch_c()
-            d = kl.koch_d()
-            e = kl.koch_e()
-
-            next_lines.append(KochLine(a,b))
-            next_lines.append(KochLine(b,c))
-            next_lines.append(KochLine(c,d))
-            next_lines.append(KochLine(d,e))
-
-        self.lines = next_lines.copy()
+        # only the new level is computed, the earlier ones stay cached
+        self.depth += 1
 
     def draw(self):
-        for kl in self.lines:
-            kl.draw()
+        screen.blit(*koch_surface((self.start.x, self.start.y), (self.end.x, self.end.y), self.depth))
@@ -1,56 +1,67 @@
-from random import randint
+import numpy as np
+import pygame
 from engine import *
 
-class Cell:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.previous = randint(0,1)
-        self.state = self.previous
+# colors indexed by previous * 2 + state
+PALETTE = np.array([(255,255,255),      # stayed dead
+                    (0,0,255),          # born
+                    (255,0,0),          # died
+                    (0,0,0)],           # stayed alive
+                   dtype=np.uint8)
+GRID_COLOR = (200,200,200)
 
 class Life:
-    def __init__(self, max_width, max_height):
-        self.w = 10
+    def __init__(self, max_width, max_height, w=10, edges='bounded'):
+        # edges is 'bounded' (cells beyond the edge are dead) or 'toroidal' (the board wraps)
+        self.w = w
+        self.edges = edges
         self.columns = max_width//self.w
         self.rows = max_height//self.w
-        
-        self.board = [[Cell(x,y) for x in range(self.columns)] for y in range(self.rows)]
+
+        # boards are indexed [x, y] to match pygame.surfarray
+        self.board = np.random.randint(0, 2, (self.columns, self.rows), dtype=np.uint8)
+        self.previous = self.board.copy()
+
+        self.surface = pygame.Surface((self.columns * self.w, self.rows * self.w))
+
+        # cell outlines, only worth drawing when cells are a few pixels wide
+        self.grid = None
+        if self.w > 2:
+            edge_x = np.isin(np.arange(self.columns * self.w) % self.w, (0, self.w - 1))
+            edge_y = np.isin(np.arange(self.rows * self.w) % self.w, (0, self.w - 1))
+            self.grid = edge_x[:, np.newaxis] | edge_y[np.newaxis, :]
+
+    def neighbors(self):
+        board = self.board
+        if self.edges == 'toroidal':
+            total = np.zeros(board.shape, dtype=np.uint8)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    if dx or dy:
+                        total += np.roll(board, (dx, dy), axis=(0, 1))
+            return total
+
+        padded = np.pad(board, 1)
+        total = np.zeros(board.shape, dtype=np.uint8)
+        w, h = board.shape
+        for dx in (0, 1, 2):
+            for dy in (0, 1, 2):
+                if dx != 1 or dy != 1:
+                    total += padded[dx:dx+w, dy:dy+h]
+        return total
 
     def generate(self):
-        for x in range(1,self.columns-1):
-            for y in range(1,self.rows-1):
-                self.board[y][x].previous = self.board[y][x].state
-
-        for x in range(1,self.columns-1):
-            for y in range(1,self.rows-1):
-                neighbors = 0
-                for i in range(-1,2):
-                    for j in range(-1,2):
-                        neighbors += self.board[y+i][x+j].previous
-                neighbors -= self.board[y][x].previous
-
-                if self.board[y][x].previous == 1 and neighbors < 2:
-                    self.board[y][x].state = 0
-                elif self.board[y][x].previous == 1 and neighbors > 3:
-                    self.board[y][x].state = 0
-                elif self.board[y][x].previous == 0 and neighbors == 3:
-                    self.board[y][x].state = 1
-                else:
-                    self.board[y][x].state = self.board[y][x].previous
+        neighbors = self.neighbors()
+        self.previous = self.board
+        self.board = ((neighbors == 3) | ((self.board == 1) & (neighbors == 2))).astype(np.uint8)
 
     def draw(self):
-        for x in range(self.columns):
-            for y in range(self.rows):
-                cell = self.board[y][x]
-
-                if cell.state == 1 and cell.previous == 0:
-                    color = (0,0,255)
-                elif cell.state == 1 and cell.previous == 1:
-                    color = (0,0,0)
-                elif cell.state == 0 and cell.previous == 1:
-                    color = (255,0,0)
-                elif cell.state == 0 and cell.previous == 0:
-                    color = (255,255,255)
-
-                screen.draw.rect((x*self.w, y*self.w, self.w, self.w), color, 0)
-                screen.draw.rect((x*self.w, y*self.w, self.w, self.w), (200,200,200), 1)
+        cells = PALETTE[self.previous * 2 + self.board]
+        if self.w > 1:
+            pixels = cells.repeat(self.w, axis=0).repeat(self.w, axis=1)
+        else:
+            pixels = cells
+        if self.grid is not None:
+            pixels[self.grid] = GRID_COLOR
+        pygame.surfarray.blit_array(self.surface, pixels)
+        screen.blit(self.surface, (0, 0))
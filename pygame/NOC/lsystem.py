@@ -1,7 +1,9 @@
+import math
+import numpy as np
 import pygame
 from pygame.locals import *
 from engine import *
-from screen_matrix import sm, line, translate, rotate, push_matrix, pop_matrix
+from screen_matrix import sm
 
 class Rule:
     def __init__(self, p, s):
@@ -12,27 +14,47 @@ class LSystem:
     def __init__(self, axiom, ruleset):
         self.axiom = axiom
         self.ruleset = ruleset
+        self.generation = 0
 
-    def generate(self):
-        next_ = []
+        # compile the rules into a lookup from symbol to its replacement
+        self.rules = {rule.predecessor: rule.successor for rule in ruleset}
 
-        for i in range(len(self.axiom)):
-            c = self.axiom[i]
-            for j in self.ruleset:
-                if c == j.predecessor:
-                    next_.append(j.successor)
-                else:
-                    next_.append(c)
+    def generate(self):
+        # generations are expanded on demand by symbols(), so this only
+        # records how deep the expansion should go
+        self.generation += 1
 
-        self.axiom = ''.join(next_)
+    def symbols(self):
+        # depth first expansion with one iterator per level, so the full
+        # sentence never has to exist in memory
+        stack = [(iter(self.axiom), self.generation)]
+        while stack:
+            symbols, depth = stack[-1]
+            for c in symbols:
+                if depth > 0 and c in self.rules:
+                    stack.append((iter(self.rules[c]), depth - 1))
+                    break
+                yield c
+            else:
+                stack.pop()
 
     def get_sentence(self):
-        return self.axiom
+        return ''.join(self.symbols())
 
 class Turtle:
+    # segments are interpreted at unit length and scaled when drawn, so
+    # change_len() doesn't need the sentence again
+    INITIAL_CAPACITY = 1024
+
     def __init__(self, sentence, length, angle):
         self.length = length
         self.angle = angle
+        self.commands = {'F': self.forward,
+                         'G': self.move,
+                         '+': self.turn_right,
+                         '-': self.turn_left,
+                         '[': self.push,
+                         ']': self.pop}
         self.set_to_do(sentence)
 
     def change_len(self, factor):
@@ -40,23 +62,60 @@ class Turtle:
 
     def render(self):
         screen.fill(Color("white"))
-        for i in self.to_do:
-            exec(i)
+        points = sm.transform(self.points[:self.count] * self.length).tolist()
+        for start, end in self.strokes:
+            screen.draw.lines(sm.color, points[start:end])
         pygame.display.update()
 
     def set_to_do(self, sentence):
-        self.to_do = []
+        # sentence can be a string or a generator such as LSystem.symbols()
+        self.points = np.empty((self.INITIAL_CAPACITY, 2))
+        self.count = 0
+        self.strokes = []
+        self.stroke_start = None
+        self.x, self.y, self.heading = 0.0, 0.0, 0.0
+        self.stack = []
+
+        commands = self.commands
         for c in sentence:
-            if c == 'F':
-                self.to_do.append(f"line(0,0,{self.length},0)")
-                self.to_do.append(f"translate({self.length},0)")
-            elif c == 'G':
-                self.to_do.append(f"translate({self.length},0)")
-            elif c == '+':
-                self.to_do.append(f"rotate({self.angle})")
-            elif c == '-':
-                self.to_do.append(f"rotate(-{self.angle})")
-            elif c == '[':
-                self.to_do.append(f"push_matrix()")
-            elif c == ']':
-                self.to_do.append(f"pop_matrix()")
+            command = commands.get(c)
+            if command:
+                command()
+        self.end_stroke()
+
+    def add_point(self, x, y):
+        if self.count == len(self.points):
+            self.points = np.concatenate((self.points, np.empty_like(self.points)))
+        self.points[self.count] = (x, y)
+        self.count += 1
+
+    def end_stroke(self):
+        if self.stroke_start is not None:
+            self.strokes.append((self.stroke_start, self.count))
+            self.stroke_start = None
+
+    def forward(self):
+        if self.stroke_start is None:
+            self.stroke_start = self.count
+            self.add_point(self.x, self.y)
+        self.x += math.cos(self.heading)
+        self.y += math.sin(self.heading)
+        self.add_point(self.x, self.y)
+
+    def move(self):
+        self.end_stroke()
+        self.x += math.cos(self.heading)
+        self.y += math.sin(self.heading)
+
+    def turn_right(self):
+        self.heading += self.angle
+
+    def turn_left(self):
+        self.heading -= self.angle
+
+    def push(self):
+        self.stack.append((self.x, self.y, self.heading))
+
+    def pop(self):
+        self.end_stroke()
+        self.x, self.y, self.heading = self.stack.pop()
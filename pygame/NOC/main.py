@@ -14,7 +14,7 @@ from oscillator import Oscillator
 from wave import Wave
 from pendulum import Pendulum
 from spring import Spring
-from particles import ParticleSystem, Particle, Smoke
+from particles import ParticleSystem, Smoke
 from vehicle import Vehicle
 from grid import Grid
 from flow_field import FlowField
@@ -144,5 +144,3 @@ run()
 # clean up every project to this standard. (Though I _also_ have acquired quite a backlog of 
 # polish and integration work on the engine...)
 
-# Another TO_DO: I hate the syntax I created for PVector math operators. The imperative mutator
-# feels wrong every time I write it. Rework so I can replace with a civilized += notation instead.
@@ -1,99 +1,106 @@
-import math
 from random import random
-from pvector import PVector
-from screen_matrix import push_matrix, pop_matrix, translate, circle, line
-from engine import remap, screen, lerp
-
-class Neuron:
-    def __init__(self, x, y, id_):
-        self.location = PVector(x,y)
-        self.connections = []
-        self.sum = 0
-        self.id = id_
-        self.color = (0,255,0)
+import numpy as np
+import pygame
+from pygame import Surface
+from pygame.locals import SRCALPHA
+from engine import remap, screen
 
-    def draw(self):
-        for c in self.connections:
-            c.draw()
-        circle(self.location.x, self.location.y, 16, self.color, 0)
-        circle(self.location.x, self.location.y, 16, (0,0,0), 1)
-
-    def update(self):
-        for c in self.connections:
-            c.update()
-
-    def add_connection(self, connection):
-        self.connections.append(connection)
+# a neuron passes its sum on once the sum goes over THRESHOLD
+THRESHOLD = 1
+# pulses close this fraction of the remaining distance each frame
+PULSE_SPEED = 0.1
 
-    def feed_forward(self, value):
-        self.sum += value
-        if self.sum > 1:
-            self.fire()
-            self.color = (255,0,0)
-        else:
-            self.color = (0,255,0)
-
-    def fire(self):
-        for c in self.connections:
-            c.feed_forward(self.sum)
-        self.sum = 0
+FIRED = (255,0,0)
+RESTING = (0,255,0)
 
 class Network:
-    def __init__(self, x, y):
-        self.location = PVector(x,y)
-        self.neurons = []
-
-    def add_neuron(self, neuron):
-        self.neurons.append(neuron)
-
-    def connect(self, a, b):
-        a.add_connection(Connection(a, b, random()))
-
-    def draw(self):
-        push_matrix()
-        translate(self.location.x, self.location.y)
-        for n in self.neurons:
-            n.draw()
-        pop_matrix()
+    def __init__(self, x, y, layers):
+        # layers lists (x, [y, ...]) neuron positions relative to the network,
+        # and every neuron connects to every neuron in the next layer
+        self.location = (x, y)
+        self.positions = [np.column_stack((np.full(len(ys), lx), ys)) + self.location
+                          for lx, ys in layers]
+        sizes = [len(ys) for lx, ys in layers]
+
+        # weights[i][a, b] connects neuron a of layer i to neuron b of layer i+1
+        self.weights = [np.random.random((a, b)) for a, b in zip(sizes, sizes[1:])]
+        self.sums = [np.zeros(n) for n in sizes]
+        self.fired = [np.zeros(n, dtype=bool) for n in sizes]
+
+        # each pulse is [progress, steps], where steps lists the (layer, senders,
+        # receivers fired) hops of one feed_forward() still to be shown
+        self.pulses = []
+        self.surface = None
+
+    def forward(self, inputs):
+        # the sums of every layer for a batch of inputs, a row per sample,
+        # without touching the network's own state
+        sums = [np.atleast_2d(np.asarray(inputs, dtype=float))]
+        for w in self.weights:
+            s = sums[-1]
+            sums.append(np.where(s > THRESHOLD, s, 0) @ w)
+        return sums
 
     def feed_forward(self, value):
-        start = self.neurons[0]
-        start.feed_forward(value)
+        # the values are settled here at once; update() only animates them
+        self.sums[0] += value
+        self.fired[0] = self.sums[0] > THRESHOLD
+
+        steps = []
+        for i, w in enumerate(self.weights):
+            fire = self.sums[i] > THRESHOLD
+            if not fire.any():
+                break
+            output = np.where(fire, self.sums[i], 0)
+            self.sums[i][fire] = 0
+            self.sums[i+1] += output @ w
+            steps.append((i, fire, self.sums[i+1] > THRESHOLD))
+
+        # the output layer fires into nothing, but its sums still reset
+        fire = self.sums[-1] > THRESHOLD
+        self.sums[-1][fire] = 0
+
+        if steps:
+            self.pulses.append([0.0, steps])
 
     def update(self):
-        for n in self.neurons:
-            n.update()
-
-class Connection:
-    def __init__(self, from_, to_, weight):
-        self.weight = weight
-        self.a = from_
-        self.b = to_
-        self.sending = False
-        self.sender = from_.location.copy()
-        self.output = 0
+        for pulse in self.pulses:
+            pulse[0] += (1 - pulse[0]) * PULSE_SPEED
+            if pulse[0] > 0.99:
+                layer, senders, received = pulse[1].pop(0)
+                self.fired[layer+1] = received
+                pulse[0] = 0.0
+        self.pulses = [pulse for pulse in self.pulses if pulse[1]]
 
     def draw(self):
-        line_weight = math.floor(remap(self.weight, 0, 1, 1, 6))
-        line(self.a.location.x, self.a.location.y, self.b.location.x, self.b.location.y, line_weight)
-        if self.sending:
-            circle(self.sender.x, self.sender.y, 8, (0,0,0), 0)
-
-    def update(self):
-        if self.sending:
-            self.sender.x = lerp(self.sender.x, self.b.location.x, 0.1)
-            self.sender.y = lerp(self.sender.y, self.b.location.y, 0.1)
-
-            d = PVector.dist(self.sender, self.b.location)
-
-            if d < 1:
-                self.b.feed_forward(self.output)
-                self.sending = False
-
-    def feed_forward(self, value):
-        self.output = value * self.weight
-        self.sender = self.a.location.copy()
-        self.sending = True
+        # the connections only change with the weights, so draw them once
+        if self.surface is None:
+            self.surface = self.render()
+        screen.blit(self.surface, (0, 0))
+
+        for progress, steps in self.pulses:
+            layer, senders, received = steps[0]
+            start = self.positions[layer][senders][:, np.newaxis]
+            end = self.positions[layer+1][np.newaxis]
+            points = start + (end - start) * progress
+            points = points[self.weights[layer][senders] > 0]
+            screen.draw.circles(points.tolist(), 8, (0,0,0))
+
+        for positions, fired in zip(self.positions, self.fired):
+            screen.draw.circles(positions[fired].tolist(), 16, FIRED)
+            screen.draw.circles(positions[~fired].tolist(), 16, RESTING)
+            screen.draw.circles(positions.tolist(), 16, (0,0,0), 1)
+
+    def render(self):
+        surface = Surface(screen.surface.get_size(), flags=SRCALPHA)
+        for i, w in enumerate(self.weights):
+            a, b = np.nonzero(w)
+            widths = np.floor(remap(w[a, b], 0, 1, 1, 6)).astype(int)
+            starts = self.positions[i][a].tolist()
+            ends = self.positions[i+1][b].tolist()
+            for start, end, width in zip(starts, ends, widths.tolist()):
+                pygame.draw.line(surface, (0,0,0), start, end, width)
+        return surface
 
 class NeuralNetwork:
     def __init__(self, max_width, max_height):
@@ -101,26 +108,8 @@ class NeuralNetwork:
         self.max_height = max_height
         self.count = 0
 
-        self.n = Network(self.max_width//2, self.max_height//2)
-
-        self.a = Neuron(-230,0, 'a')
-        self.b = Neuron(0,100, 'b')
-        self.c = Neuron(0,-100, 'c')
-        self.d = Neuron(0,0, 'd')
-        self.e = Neuron(200,0, 'e')
-
-        self.n.add_neuron(self.a)
-        self.n.add_neuron(self.b)
-        self.n.add_neuron(self.c)
-        self.n.add_neuron(self.d)
-        self.n.add_neuron(self.e)
-
-        self.n.connect(self.a,self.b)
-        self.n.connect(self.a,self.c)
-        self.n.connect(self.a,self.d)
-        self.n.connect(self.b,self.e)
-        self.n.connect(self.c,self.e)
-        self.n.connect(self.d,self.e)
+        self.n = Network(self.max_width//2, self.max_height//2,
+                         [(-230, [0]), (0, [100, -100, 0]), (200, [0])])
 
     def update(self):
         self.n.update()
@@ -1,100 +1,145 @@
-from random import uniform, random, randint
+from random import uniform
+import numpy as np
 from pygame.locals import *
 from pvector import PVector
 from engine import *
 
+CAPACITY = 50000
+LIFESPAN = 255
+AGE_RATE = 2
+
+# translucent particles are drawn in batches sharing one alpha value
+ALPHA_STEP = 16
+ALPHA_LEVELS = LIFESPAN // ALPHA_STEP + 1
+
+class ParticlePool:
+    # fixed capacity particle storage, one NumPy array per attribute; dead
+    # slots go on a free list and are reused by later spawns
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.location = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.acceleration = np.zeros((capacity, 2))
+        self.lifespan = np.full(capacity, -1.0)
+        self.size = np.zeros(capacity)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.mass = 1
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def spawn(self, x, y, velocity, size, kind=0):
+        # velocity is a (count, 2) array; returns the slots used, which may be
+        # fewer than asked for when the pool is full
+        count = min(len(velocity), len(self.free))
+        if count == 0:
+            return np.empty(0, dtype=int)
+        index = np.array(self.free[-count:])
+        del self.free[-count:]
+
+        self.location[index] = (x, y)
+        self.velocity[index] = velocity[:count]
+        self.acceleration[index] = 0
+        self.lifespan[index] = LIFESPAN
+        self.size[index] = size[:count] if np.ndim(size) else size
+        self.kind[index] = kind[:count] if np.ndim(kind) else kind
+        self.alive[index] = True
+        return index
+
+    # dead slots are updated along with the live ones, which is cheaper than
+    # masking every step and harmless since spawn() resets them
+    def apply_force(self, force):
+        self.acceleration += np.divide(force, self.mass)
+
+    def integrate(self):
+        self.velocity += self.acceleration
+        self.location += self.velocity
+        self.acceleration[:] = 0
+
+    def age(self, rate=AGE_RATE):
+        self.lifespan -= rate
+        dead = np.flatnonzero(self.alive & (self.lifespan < 0))
+        self.alive[dead] = False
+        self.free.extend(dead.tolist())
+
+    def groups(self):
+        # live particles grouped by kind and alpha level, as (kind, alpha, slots)
+        alive = np.flatnonzero(self.alive)
+        if len(alive) == 0:
+            return []
+        # a live particle never drops to level 0, which would draw it invisible
+        level = np.maximum(self.lifespan[alive] // ALPHA_STEP, 1).astype(int)
+        group = self.kind[alive] * ALPHA_LEVELS + level
+        order = np.argsort(group, kind='stable')
+        alive, group = alive[order], group[order]
+        splits = np.flatnonzero(np.diff(group)) + 1
+        return [(int(group[start]) // ALPHA_LEVELS,
+                 int(group[start]) % ALPHA_LEVELS * ALPHA_STEP,
+                 slots)
+                for start, slots in zip(np.concatenate(([0], splits)), np.split(alive, splits))]
+
 class ParticleSystem:
-    def __init__(self, x, y):
-        self.particles = []
+    # each kind of particle is drawn as circles of its own color; the book's
+    # confetti rotates, but a random size and color tell it apart well enough
+    COLORS = [(255,64,64), (0,255,0)]
+    PARTICLE, CONFETTI = 0, 1
+
+    def __init__(self, x, y, capacity=CAPACITY):
+        self.pool = ParticlePool(capacity)
         self.origin = PVector(x,y)
         self.gravity = PVector(0, 0.1)
 
-    def add_particle(self):
-        if random() < 0.8: 
-            self.particles.append(Particle(self.origin.x, self.origin.y))
-        else:
-            self.particles.append(Confetti(self.origin.x, self.origin.y))
+    def add_particle(self, count=1):
+        velocity = np.column_stack((np.random.uniform(-1, 1, count), np.random.uniform(-2, 0, count)))
+        confetti = np.random.random(count) >= 0.8
+        size = np.where(confetti, np.random.randint(2, 21, count), 8)
+        kind = np.where(confetti, self.CONFETTI, self.PARTICLE)
+        self.pool.spawn(self.origin.x, self.origin.y, velocity, size, kind)
 
     def update(self):
         self.apply_force(self.gravity)
-        for p in self.particles:
-            p.update()
-            if p.is_dead():
-                self.particles.remove(p)
+        self.pool.integrate()
+        self.pool.age()
 
     def draw(self):
-        for p in self.particles:
-            p.draw()
+        for kind, alpha, slots in self.pool.groups():
+            centers = self.pool.location[slots].tolist()
+            radius = self.pool.size[slots].tolist()
+            screen.draw.circles(centers, radius, (*self.COLORS[kind], alpha))
+            screen.draw.circles(centers, radius, (0,0,0,alpha), 1)
 
     def random_walk(self):
         self.origin.x += (uniform(-5,5))
         self.origin.y += (uniform(-5,5))
 
     def apply_force(self, force):
-        for p in self.particles:
-            p.apply_force(force)
+        self.pool.apply_force((force.x, force.y))
 
     def apply_repulsor(self, repulsor):
-        for p in self.particles:
-            force = repulsor.attract(p)
-            p.apply_force(force)
-
-class Particle:
-    def __init__(self, x, y):
-        self.location = PVector(x,y)
-        self.acceleration = PVector(0,0)
-        self.velocity = PVector(uniform(-1,1), uniform(-2,0))
-        self.lifespan = 255
-        self.mass = 1
-
-    def update(self):
-        self.velocity + self.acceleration
-        self.location + self.velocity
-        self.acceleration * 0
-        self.lifespan -= 2
-
-    def draw(self):
-        # TO_DO: add alpha support to Painter.circle()
-        if self.lifespan >= 0:
-            screen.draw.circle(self.location.x, self.location.y, 8, (255,64,64,self.lifespan))
-            screen.draw.circle(self.location.x, self.location.y, 8, (0,0,0,self.lifespan), 1)
+        self.pool.apply_force(repulsor.attract_all(self.pool.location, self.pool.mass))
 
-    def is_dead(self):
-        return self.lifespan < 0.0
-
-    def apply_force(self, force):
-        f = PVector.div(force, self.mass)
-        self.acceleration + f
-
-# book example uses rotation, but my current implementation is a hassle to set up
-# will try a random size and different color instead to distinguish... the example
-# is really about inheritance/polymorphism anyway
-# TO_DO: simplify rotation
-class Confetti(Particle):
-    def __init__(self, x, y):
-        self.size = randint(2,20)
-        super().__init__(x, y)
+class Smoke(ParticleSystem):
+    def __init__(self, x, y, capacity=CAPACITY):
+        super().__init__(x, y, capacity)
+        self.gravity = PVector(0,-0.01)
 
-    def draw(self):
-        if self.lifespan >= 0:
-            screen.draw.circle(self.location.x, self.location.y, self.size, (0,255,0,self.lifespan))
-            screen.draw.circle(self.location.x, self.location.y, self.size, (0,0,0,self.lifespan), 1)
+        # one copy of the texture per alpha level, so each level is one blits() call
+        texture = images.texture_2
+        self.images = []
+        for level in range(ALPHA_LEVELS):
+            image = texture.copy()
+            image.set_alpha(level * ALPHA_STEP // 2)
+            self.images.append(image)
 
-class SmokeParticle(Particle):
-    def __init__(self, x, y):
-        self.image = images.texture_2
-        super().__init__(x,y)
-        self.velocity = PVector(uniform(-1.0,1.0)*0.7, random()*0.3-1.0)
+    def add_particle(self, count=1):
+        velocity = np.column_stack((np.random.uniform(-1, 1, count) * 0.7,
+                                    np.random.random(count) * 0.3 - 1.0))
+        self.pool.spawn(self.origin.x, self.origin.y, velocity, 0)
 
     def draw(self):
-        if self.lifespan >= 0:
-            self.image.set_alpha(self.lifespan//2)
-            screen.blit(self.image, (self.location.x, self.location.y), special_flags=BLEND_RGBA_ADD)
-
-class Smoke(ParticleSystem):
-    def __init__(self, x, y):
-        super().__init__(x, y)
-        self.gravity = PVector(0,-0.01)
-
-    def add_particle(self):
-        self.particles.append(SmokeParticle(self.origin.x, self.origin.y))
+        for kind, alpha, slots in self.pool.groups():
+            image = self.images[alpha // ALPHA_STEP]
+            screen.blits([(image, position, None, BLEND_RGBA_ADD)
+                          for position in self.pool.location[slots].tolist()])
@@ -1,5 +1,6 @@
 import math
 from random import uniform, randint
+import numpy as np
 import pygame
 from pygame import Rect, Surface, transform
 from pygame.locals import SRCALPHA
@@ -108,22 +109,28 @@ class Perceptron:
     c = 0.01
 
     def __init__(self, n):
-        self.weights = [uniform(-1,1) for i in range(n)]
+        self.weights = np.random.uniform(-1, 1, n)
 
     def feedforward(self, inputs):
-        sum_ = 0
-        for i in range(len(self.weights)):
-            sum_ += inputs[i] * self.weights[i]
-        return self.activate(sum_)
+        return self.activate(np.dot(inputs, self.weights))
 
     def activate(self, n):
         return 1 if n > 0 else -1
 
+    def classify(self, inputs):
+        # feedforward() for an (N, n) array of inputs in one product
+        return np.where(np.asarray(inputs) @ self.weights > 0, 1, -1)
+
     def train(self, inputs, desired):
         guess = self.feedforward(inputs)
         error = desired - guess
-        for i in range(len(self.weights)):
-            self.weights[i] += Perceptron.c * error * inputs[i]
+        self.weights += Perceptron.c * error * np.asarray(inputs)
+
+    def train_batch(self, inputs, desired):
+        # one update from the summed errors over a batch of labeled inputs
+        inputs = np.asarray(inputs)
+        error = np.asarray(desired) - self.classify(inputs)
+        self.weights += Perceptron.c * (error @ inputs)
 
     def process(self, forces):
         sum_ = PVector(0,0)
@@ -134,51 +141,67 @@ class Perceptron:
 
     def train_vehicle(self, forces, error):
         for i in range(len(self.weights)):
-            self.weights[i] + Perceptron.c * error.x * forces[i].x
-            self.weights[i] + Perceptron.c * error.y * forces[i].y
-
-class Trainer:
-    def __init__(self, x, y, a):
-        self.inputs = [x, y, 1]
-        self.answer = a
+            self.weights[i] += Perceptron.c * error.x * forces[i].x
+            self.weights[i] += Perceptron.c * error.y * forces[i].y
 
 def f(x):
     return x / 2 + 100
 
 class Simulation:
-    def __init__(self, max_width, max_height):
+    def __init__(self, max_width, max_height, size=2000, batch_size=10):
         self.max_width = max_width
         self.max_height = max_height
         self.p = Perceptron(3)
-        self.training = []
+        self.batch_size = batch_size
+        # cursor walks the training set round and round, count is how many points are drawn
+        self.cursor = 0
         self.count = 0
 
-        for i in range(2000):
-            x = randint(0, max_width)
-            y = randint(0, max_height)
-            if y < f(x):
-                a = -1
-            else:
-                a = 1
-            self.training.append(Trainer(x,y,a))
+        x = np.random.randint(0, max_width + 1, size)
+        y = np.random.randint(0, max_height + 1, size)
+        self.points = np.column_stack((x, y)).astype(float)
+
+        # each row of inputs is (x, y, bias), with x and y scaled to 0..1 so
+        # the bias weight learns as fast as the others
+        self.inputs = np.column_stack((x / max_width, y / max_height, np.ones(size)))
+        self.answers = np.where(y < f(x), -1, 1)
 
     def update(self):
-        self.p.train(self.training[self.count].inputs, self.training[self.count].answer)
-        self.count = (self.count + 1) % len(self.training)
+        # train on the next batch of points, wrapping at the end of the set
+        index = np.arange(self.cursor, self.cursor + self.batch_size) % len(self.inputs)
+        self.p.train_batch(self.inputs[index], self.answers[index])
+        self.cursor = (self.cursor + self.batch_size) % len(self.inputs)
+        self.count = min(self.count + self.batch_size, len(self.inputs))
+
+    def accuracy(self):
+        return np.mean(self.p.classify(self.inputs) == self.answers)
+
+    def converge(self, epochs, batch_size=None):
+        # train headless over the whole set, returning the accuracy after each epoch
+        batch_size = batch_size or len(self.inputs)
+        history = []
+        for epoch in range(epochs):
+            for start in range(0, len(self.inputs), batch_size):
+                self.p.train_batch(self.inputs[start:start+batch_size],
+                                   self.answers[start:start+batch_size])
+            history.append(self.accuracy())
+        return history
 
     def draw(self):
         p1 = (0, f(0))
         p2 = (self.max_width, f(self.max_width))
         screen.draw.line((0,0,0), p1, p2)
 
-        for i in range(self.count):
-            guess = self.p.feedforward(self.training[i].inputs)
-            if guess > 0:
-                color = (0,0,255)
-            else:
-                color = (255,0,0)
+        # where the weights put the boundary: w0 * x/width + w1 * y/height + w2 = 0
+        w0, w1, w2 = self.p.weights
+        if w1 != 0:
+            y = lambda x: -(w0 * x / self.max_width + w2) / w1 * self.max_height
+            screen.draw.line((128,128,128), (0, y(0)), (self.max_width, y(self.max_width)))
 
-            screen.draw.circle(self.training[i].inputs[0], self.training[i].inputs[1], 4, color, 0)
+        guesses = self.p.classify(self.inputs[:self.count])
+        seen = self.points[:self.count]
+        for answer, color in ((1, (0,0,255)), (-1, (255,0,0))):
+            screen.draw.circles(seen[guesses == answer].tolist(), 4, color)
 
 class VehicleSimulation:
     def __init__(self, max_width, max_height):
@@ -1,12 +1,15 @@
-from random import uniform, choice, randint, random
+from bisect import bisect
+from itertools import accumulate
+from random import uniform, randint, random
+import numpy as np
 from engine import *
-from pvector import PVector
+from pvector import PVector, VectorArray
 
 class Population:
     def __init__(self, mutation_rate, size, lifetime, max_width, max_height, obstacles, target):
         self.mutation_rate = mutation_rate
         self.population = [Rocket(lifetime, max_width, max_height, obstacles, target) for i in range(size)]
-        self.mating_pool = []
+        self.cumulative_fitness = []
         self.generations = 0
         self.lifetime = lifetime
 
@@ -14,33 +17,77 @@ class Population:
         for p in self.population:
             p.run()
 
+    def simulate(self, start=0):
+        # run the rest of a lifetime for every rocket at once, off screen,
+        # from frame start on, leaving each rocket in the state run() would
+        # have at the end of the lifetime
+        rockets = self.population
+        genes = np.stack([r.dna.genes for r in rockets])
+        gene_counter = np.array([r.gene_counter for r in rockets])
+        index = np.arange(len(rockets))
+        location = np.array([(r.location.x, r.location.y) for r in rockets], dtype=float)
+        velocity = np.array([(r.velocity.x, r.velocity.y) for r in rockets], dtype=float)
+        stopped = np.array([r.stopped for r in rockets])
+        hit_target = np.array([r.hit_target for r in rockets])
+        finish_time = np.array([r.finish_time for r in rockets])
+        record_distance = np.array([r.record_distance for r in rockets], dtype=float)
+
+        target = (rockets[0].target.x, rockets[0].target.y)
+        radius = rockets[0].radius
+        obstacles = [(o.location.x, o.location.y, o.location.x + o.width, o.location.y + o.height)
+                     for o in rockets[0].obstacles]
+
+        for t in range(start, self.lifetime):
+            active = ~stopped
+            moving = active[:, np.newaxis]
+            velocity += genes[index, gene_counter] * moving
+            gene_counter = (gene_counter + active) % self.lifetime
+            location += velocity * moving
+
+            x, y = location[:, 0], location[:, 1]
+            for left, top, right, bottom in obstacles:
+                inside = active & (x > left) & (x < right) & (y > top) & (y < bottom)
+                stopped |= inside
+                finish_time[inside] = self.lifetime
+
+            d = np.hypot(x - target[0], y - target[1])
+            record_distance = np.where(active, np.minimum(record_distance, d), record_distance)
+            hit_target |= active & (d < radius)
+            finish_time += active & (d >= radius)
+
+        for i, r in enumerate(rockets):
+            r.location = PVector(*location[i].tolist())
+            r.velocity = PVector(*velocity[i].tolist())
+            r.gene_counter = int(gene_counter[i])
+            r.stopped = bool(stopped[i])
+            r.hit_target = bool(hit_target[i])
+            r.finish_time = int(finish_time[i])
+            r.record_distance = float(record_distance[i])
+
     def fitness(self):
         for p in self.population:
             p.calculate_fitness()
 
     def selection(self):
-        self.mating_pool = []
-        for p in self.population:
-            n = int(p.fitness * 100)
-            for i in range(n):
-                self.mating_pool.append(p)
-
-        if len(self.mating_pool) == 0:
-            self.population.sort(key=lambda r: r.fitness)
-            for i in range(len(self.population)//2):
-                self.mating_pool.append(self.population[i])
+        # roulette wheel selection: pick() bisects the running total of fitness
+        weights = [max(p.fitness, 0) for p in self.population]
+        total = sum(weights)
+        if total == 0:
+            weights = [1] * len(self.population)
+            total = len(weights)
             print("zero pool")
+        self.cumulative_fitness = list(accumulate(weights))
 
-        total_fitness = 0
-        for r in self.mating_pool:
-            total_fitness += r.fitness
-        print(f"Average mating pool fitness: {total_fitness/len(self.mating_pool):0.5f}")
+        # the mean fitness of a rocket drawn from the wheel
+        return sum(w * p.fitness for w, p in zip(weights, self.population)) / total
 
-    def reproduction(self):
-        for i in range(len(self.population)):
-            parent_a = choice(self.mating_pool)
-            parent_b = choice(self.mating_pool)
+    def pick(self):
+        i = bisect(self.cumulative_fitness, random() * self.cumulative_fitness[-1])
+        return self.population[min(i, len(self.population) - 1)]
 
+    def reproduction(self):
+        parents = [(self.pick(), self.pick()) for i in range(len(self.population))]
+        for i, (parent_a, parent_b) in enumerate(parents):
             child = parent_a.crossover(parent_b)
             child.mutate(self.mutation_rate)
 
@@ -64,7 +111,7 @@ class Obstacle:
             return False
 
     def draw(self):
-        screen.draw.rect((self.location.x, self.location.y, self.width, self.height), (0,0,255), 0)
+        screen.draw.rect(self.location.x, self.location.y, self.width, self.height, (0,0,255), 0)
 
 class Rocket:
     def __init__(self, lifetime, max_width, max_height, obstacles, target):
@@ -153,7 +200,7 @@ class Rocket:
 
     def run(self):
         if not self.stopped:
-            self.apply_force(self.dna.genes[self.gene_counter])
+            self.apply_force(PVector(*self.dna.genes[self.gene_counter]))
             self.gene_counter += 1
             self.gene_counter %= self.lifetime
             self.update()
@@ -194,31 +241,27 @@ class Rocket:
         screen.draw.circle(self.location.x, self.location.y, self.radius, (0, 0, 0), 1)
 
 class DNA:
-    def __init__(self, lifetime):
+    # genes are a (lifetime, 2) array of forces, one per frame
+    def __init__(self, lifetime, genes=None):
         self.max_force = 0.1
-        self.genes = []
-        for i in range(lifetime):
-            vec = PVector.random2D()
-            vec * (uniform(0, self.max_force))
-            self.genes.append(vec)
+        if genes is None:
+            genes = self.random_genes(lifetime)
+        self.genes = genes
         self.lifetime = lifetime
 
+    def random_genes(self, count):
+        return VectorArray.random2D(count).xy * np.random.uniform(0, self.max_force, (count, 1))
+
     def crossover(self, partner):
-        child = DNA(self.lifetime)
-        midpoint = randint(0,len(child.genes))
-        for i in range(len(child.genes)):
-            if i > midpoint:
-                child.genes[i] = self.genes[i]
-            else:
-                child.genes[i] = partner.genes[i]
-        return child
+        midpoint = randint(0, self.lifetime)
+        from_self = (np.arange(self.lifetime) > midpoint)[:, np.newaxis]
+        return DNA(self.lifetime, np.where(from_self, self.genes, partner.genes))
 
     def mutate(self, mutation_rate):
-        for i in range(len(self.genes)):
-            if random() < mutation_rate:
-                vec = PVector.random2D()
-                vec * (uniform(0, self.max_force))
-                self.genes[i] = vec
+        mutated = np.random.random(self.lifetime) < mutation_rate
+        count = np.count_nonzero(mutated)
+        if count:
+            self.genes[mutated] = self.random_genes(count)
 
 class SmartRockets:
     def __init__(self, max_width, max_height):
@@ -239,7 +282,8 @@ class SmartRockets:
                 self.live()
                 self.life_counter += 1
             else:
-                self.breed()
+                average = self.breed()
+                print(f"Average mating pool fitness: {average:0.5f}")
                 self.life_counter = 0
                 self.generation += 1
 
@@ -248,8 +292,21 @@ class SmartRockets:
 
     def breed(self):
         self.population.fitness()
-        self.population.selection()
+        average = self.population.selection()
         self.population.reproduction()
+        return average
+
+    def evolve(self, generations, report_every=100):
+        # evolve off screen, simulating each generation in one batch, then
+        # resume drawing with the newest generation; a generation already
+        # part way through on screen is finished from where it is
+        for i in range(generations):
+            self.population.simulate(self.life_counter)
+            self.life_counter = 0
+            average = self.breed()
+            self.generation += 1
+            if report_every and self.generation % report_every == 0:
+                print(f"Generation {self.generation}: average mating pool fitness {average:0.5f}")
 
     def draw(self):
         self.population.draw()
@@ -1,8 +1,34 @@
 import math
+from contextlib import contextmanager
 from engine import *
 from pvector import PVector
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 class ScreenMatrix:
+    """Holds the current 2D affine transform and a stack of saved transforms.
+
+    The transform is kept as the six coefficients (a, b, c, d, e, f) of
+
+        | a c e |
+        | b d f |
+        | 0 0 1 |
+
+    and composed in plain Python, since each translate() or rotate() is tiny.
+    The 3x3 NumPy version is built on demand and cached until the transform
+    changes, and transform() applies it to a whole array of points at once.
+    Inside a batch(), lines are recorded with their transform and converted
+    together with a single NumPy operation when the batch ends.
+
+    NumPy is optional: without it, matrix and transform() are unavailable,
+    batched lines are converted one at a time, and everything else works.
+    """
+
+    IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
     def __init__(self):
         self.reset()
 
@@ -10,93 +36,125 @@ class ScreenMatrix:
         return f"({self.origin.x:0.2f}, {self.origin.y:0.2f}) {self.angle:0.2f} : {self.stack}"
 
     def reset(self):
-        self.origin = PVector(0,0)
         self.color = (0,0,0)
-        self.angle = 0
         self.stack = []
+        self._batch = None
+        self._set(self.IDENTITY)
+
+    def _set(self, coefficients):
+        self._coefficients = coefficients
+        self._matrix = None
+
+    def _multiply(self, a2, b2, c2, d2, e2, f2):
+        a, b, c, d, e, f = self._coefficients
+        self._set((a*a2 + c*b2, b*a2 + d*b2,
+                   a*c2 + c*d2, b*c2 + d*d2,
+                   a*e2 + c*f2 + e, b*e2 + d*f2 + f))
+
+    @property
+    def matrix(self):
+        if np is None:
+            raise ImportError("ScreenMatrix.matrix requires numpy")
+        if self._matrix is None:
+            a, b, c, d, e, f = self._coefficients
+            self._matrix = np.array(((a, c, e), (b, d, f), (0.0, 0.0, 1.0)))
+        return self._matrix
+
+    @property
+    def origin(self):
+        return PVector(self._coefficients[4], self._coefficients[5])
+
+    @property
+    def angle(self):
+        return math.atan2(self._coefficients[1], self._coefficients[0])
+
+    @property
+    def scale_factor(self):
+        a, b, c, d, e, f = self._coefficients
+        return math.sqrt(abs(a*d - b*c))
 
     def translate(self, target):
-        target.rotate(math.degrees(self.angle))
-        self.origin + target
+        self._multiply(1, 0, 0, 1, target.x, target.y)
 
     def rotate(self, radians):
-        self.angle += radians
+        cos, sin = math.cos(radians), math.sin(radians)
+        self._multiply(cos, sin, -sin, cos, 0, 0)
+
+    def scale(self, sx, sy=None):
+        if sy is None:
+            sy = sx
+        self._multiply(sx, 0, 0, sy, 0, 0)
 
     def push_matrix(self):
-        self.stack.append((self.origin.copy(), self.angle))
+        self.stack.append(self._coefficients)
 
     def pop_matrix(self):
         if len(self.stack) > 0:
-            self.origin, self.angle = self.stack.pop()
+            self._set(self.stack.pop())
+
+    def transform(self, points):
+        """Return an (N, 2) array of the points mapped through the current transform."""
+
+        m = self.matrix
+        return np.asarray(points, dtype=float).reshape(-1, 2) @ m[:2, :2].T + m[:2, 2]
+
+    def transform_point(self, x, y):
+        a, b, c, d, e, f = self._coefficients
+        return (a*x + c*y + e, b*x + d*y + f)
+
+    @contextmanager
+    def batch(self):
+        """Defer line drawing until the end of the block, then transform and draw all lines together."""
+
+        outer = self._batch
+        if outer is None:
+            self._batch = ([], [], [])
+        try:
+            yield
+        finally:
+            if outer is None:
+                self._flush_batch()
+
+    def _flush_batch(self):
+        coefficients, endpoints, styles = self._batch
+        self._batch = None
+        if not coefficients:
+            return
+
+        if np is None:
+            for (a, b, c, d, e, f), (x1, y1, x2, y2), (color, width) in zip(coefficients, endpoints, styles):
+                screen.draw.line(color, (a*x1 + c*y1 + e, b*x1 + d*y1 + f),
+                                 (a*x2 + c*y2 + e, b*x2 + d*y2 + f), width)
+            return
+
+        m = np.array(coefficients)
+        p = np.array(endpoints).reshape(-1, 2, 2)
+        x, y = p[..., 0], p[..., 1]
+        mapped_x = m[:, 0:1] * x + m[:, 2:3] * y + m[:, 4:5]
+        mapped_y = m[:, 1:2] * x + m[:, 3:4] * y + m[:, 5:6]
+        for (sx, ex), (sy, ey), (color, width) in zip(mapped_x.tolist(), mapped_y.tolist(), styles):
+            screen.draw.line(color, (sx, sy), (ex, ey), width)
 
     def draw_line(self, start, end, width=1):
-        s = PVector(*start)
-        s.rotate(math.degrees(self.angle))
-        s + self.origin
-
-        e = PVector(*end)
-        e.rotate(math.degrees(self.angle))
-        e + self.origin
+        if self._batch is not None:
+            self._batch[0].append(self._coefficients)
+            self._batch[1].append((start[0], start[1], end[0], end[1]))
+            self._batch[2].append((self.color, width))
+            return
 
-        screen.draw.line(self.color, (s.x, s.y), (e.x, e.y), width)
+        screen.draw.line(self.color, self.transform_point(*start), self.transform_point(*end), width)
 
     def draw_circle(self, x, y, radius, color, width=0):
-        o = PVector(x,y)
-        o.rotate(math.degrees(self.angle))
-        o + self.origin
-
-        screen.draw.circle(o.x, o.y, radius, color, width)
+        screen.draw.circle(*self.transform_point(x, y), radius * self.scale_factor, color, width)
 
     def draw_rect(self, x, y, w, h, color, width=0):
-        top_left = PVector(x,y)
-        top_left.rotate(math.degrees(self.angle))
-        top_left + self.origin
-        tl = (top_left.x, top_left.y)
-
-        top_right = PVector(x+w,y)
-        top_right.rotate(math.degrees(self.angle))
-        top_right + self.origin
-        tr = (top_right.x, top_right.y)
-
-        bottom_left = PVector(x,y+h)
-        bottom_left.rotate(math.degrees(self.angle))
-        bottom_left + self.origin
-        bl = (bottom_left.x, bottom_left.y)
-
-        bottom_right = PVector(x+w,y+h)
-        bottom_right.rotate(math.degrees(self.angle))
-        bottom_right + self.origin
-        br = (bottom_right.x, bottom_right.y)
-        
-        screen.draw.polygon((tl, tr, br, bl), color, width)
+        self.draw_polygon(((x,y), (x+w,y), (x+w,y+h), (x,y+h)), color, width)
 
     def draw_triangle(self, x1, y1, x2, y2, x3, y3, color, width=0):
-        first = PVector(x1, y1)
-        first.rotate(math.degrees(self.angle))
-        first + self.origin
-        f = (first.x, first.y)
-
-        second = PVector(x2, y2)
-        second.rotate(math.degrees(self.angle))
-        second + self.origin
-        s = (second.x, second.y)
-
-        third = PVector(x3, y3)
-        third.rotate(math.degrees(self.angle))
-        third + self.origin
-        t = (third.x, third.y)
-
-        screen.draw.polygon((f, s, t), color, width)
+        self.draw_polygon(((x1,y1), (x2,y2), (x3,y3)), color, width)
 
     def draw_polygon(self, points, color, width=0):
-        vertices = []
-        for p in points:
-            pt = PVector(p[0], p[1])
-            pt.rotate(math.degrees(self.angle))
-            pt + self.origin
-            vertices.append((pt.x, pt.y))
-
-        screen.draw.polygon(vertices, color, width)
+        screen.draw.polygon([self.transform_point(x, y) for x, y in points], color, width)
 
 
 def translate(x, y):
@@ -105,12 +163,18 @@ def translate(x, y):
 def rotate(radians):
     sm.rotate(radians)
 
+def scale(sx, sy=None):
+    sm.scale(sx, sy)
+
 def push_matrix():
     sm.push_matrix()
 
 def pop_matrix():
     sm.pop_matrix()
 
+def batch():
+    return sm.batch()
+
 def line(ax, ay, bx, by, line_weight=1):
     sm.draw_line((ax, ay), (bx, by), line_weight)
 
@@ -125,6 +189,25 @@ def rect(x, y, w, h, color=(0,0,0), width=1):
 def triangle(x1, y1, x2, y2, x3, y3, color=(0,0,0), width=1):
     sm.draw_triangle(x1, y1, x2, y2, x3, y3, color, width)
 
+# TO_DO: should we shift to this model for all regular
+#        figures, rather than have the client figure out
+#        all the vertices?
+# 
+#        shape drawing should create a figure of the desired
+#        configuration at the origin - use translate() & rotate()
+#        to place it
+def equilateral_triangle(radius, color=(0,0,0), width=1):
+    sides = 3
+    tri_points = []
+    for i in range(sides):
+        angle = math.pi * 2/sides * (i+1)
+        vX = radius * math.cos(angle)
+        vY = radius * math.sin(angle)
+        tri_points.append(vX)
+        tri_points.append(vY)
+
+    triangle(*tri_points, color, width)
+
 def polygon(points, color=(0,0,0), width=1):
     sm.draw_polygon(points, color, width)
 
@@ -1,4 +1,5 @@
 import math
+from functools import cache
 from random import uniform
 import pygame
 from pygame.locals import SRCALPHA
@@ -6,6 +7,14 @@ from pygame import Rect, Surface, transform
 from engine import *
 from pvector import PVector
 
+# every Vehicle shares one source sprite so the engine's
+# transform cache can reuse rotations across all of them
+@cache
+def vehicle_surface(width, height):
+    surf = Surface((width, height), flags=SRCALPHA)
+    pygame.draw.polygon(surf, (0,0,0), [(width//2,0), (0,height), (width,height)], 0)
+    return surf
+
 class Vehicle:
     def __init__(self, x, y, max_width, max_height):
         self.location = PVector(x,y)
@@ -16,9 +25,8 @@ class Vehicle:
         self.rect = Rect(x - width/2, y - height/2, width, height)
         self.color = (0, 200, 0)
         
-        self.surf = Surface((self.rect.width, self.rect.height), flags=SRCALPHA)
-        pygame.draw.polygon(self.surf, (0,0,0), [(width//2,0), (0,height), (width,height)], 0)
-        self.original_surf = self.surf.copy()
+        self.original_surf = vehicle_surface(self.rect.width, self.rect.height)
+        self.surf = self.original_surf
 
         self.velocity = PVector(0,0)
         self.acceleration = PVector(0,0)
@@ -114,7 +122,7 @@ class Vehicle:
         return steer
 
     def rotate(self):
-        self.surf = transform.rotate(self.original_surf, -self.angle - 90)
+        self.surf = transforms.rotate(self.original_surf, -self.angle - 90)
         w,h = self.surf.get_size()
         self.rect = Rect(self.location.x-w/2, self.location.y-h/2, w, h)
 
@@ -1,45 +1,62 @@
+import numpy as np
 import pygame
 from pygame import Surface
 from engine import *
 
+# black for live cells, white for dead ones
+PALETTE = np.array([(255,255,255), (0,0,0)], dtype=np.uint8)
+
+def rule_table(rule):
+    # entry i is the next state for the neighborhood whose bits (left, me, right) spell i
+    return np.array([(rule >> i) & 1 for i in range(8)], dtype=np.uint8)
+
+def evolve(rules, width, generations, start=None):
+    # run every rule side by side and return the history indexed [rule, generation, cell]
+    rules = list(rules)
+    tables = np.concatenate([rule_table(rule) for rule in rules])
+    offsets = (np.arange(len(rules)) * 8)[:, np.newaxis]
+
+    history = np.zeros((generations, len(rules), width), dtype=np.uint8)
+    if start is None:
+        history[0, :, width//2] = 1
+    else:
+        history[0] = start
+
+    # the first and last cells have no outside neighbor and stay at 0
+    for i in range(generations - 1):
+        row = history[i]
+        index = (row[:, :-2] << 2) | (row[:, 1:-1] << 1) | row[:, 2:]
+        history[i+1, :, 1:-1] = tables[index + offsets]
+
+    return history.transpose(1, 0, 2)
+
+def history_surface(history, w=1):
+    # history is [generation, cell]; surfarray wants [x, y]
+    pixels = PALETTE[history.T]
+    if w > 1:
+        pixels = pixels.repeat(w, axis=0).repeat(w, axis=1)
+    return pygame.surfarray.make_surface(pixels)
+
+def rule_atlas(width, generations, rules=range(256), columns=16):
+    # one image with a tile per rule, laid out left to right and top to bottom
+    rules = list(rules)
+    history = evolve(rules, width, generations)
+    rows = -(-len(rules) // columns)
+    atlas = np.zeros((rows * generations, columns * width), dtype=np.uint8)
+    for i in range(len(rules)):
+        y, x = divmod(i, columns)
+        atlas[y*generations:(y+1)*generations, x*width:(x+1)*width] = history[i]
+    return history_surface(atlas)
+
 class CA:
-    def __init__(self, max_width, max_height):
+    def __init__(self, max_width, max_height, rule=30):
+        # rule 90 - Sierpinski Triangle, rule 30 - Class 3 Random, rule 110 - Class 4 Complex
         self.w = 1
+        self.rule = rule
+        self.ruleset = rule_table(rule)
 
-        #self.ruleset = [0,1,0,1,1,0,1,0]   # Rule 90 - Sierpinski Triangle
-        self.ruleset = [0,1,1,1,1,0,0,0]    # Rule 30 - Class 3 Random
-        #self.ruleset = [0,1,1,1,0,1,1,0]    # Rule 110 - Class 3 Random
-
-        self.cells = [[0 for i in range(max_width//self.w)] for j in range(max_height//self.w)]
-        self.cells[0][len(self.cells[0])//2] = 1
-        self.generate()
-
-        self.image = Surface((max_width,max_height))
-        for i in range(max_height//self.w):
-            for j in range(len(self.cells[0])):
-                if self.cells[i][j] == 1:
-                    color = (0,0,0)
-                else:
-                    color = (255,255,255)
-    
-                pygame.draw.rect(self.image, color, (j*self.w, i*self.w, self.w, self.w), 0)
-
-    def generate(self):
-        for i in range(len(self.cells)-1):
-            nextrow = [0 for i in range(len(self.cells[0]))]
-            for j in range(1, len(self.cells[0])-1):
-                left = self.cells[i][j-1]
-                me = self.cells[i][j]
-                right = self.cells[i][j+1]
-
-                nextrow[j] = self.rules(left, me, right)
-
-            self.cells[i+1] = nextrow
-
-    def rules(self, a, b, c):
-        s = "" + str(a) + str(b) + str(c)
-        index = int(s, 2)
-        return self.ruleset[index]
+        self.cells = evolve([rule], max_width//self.w, max_height//self.w)[0]
+        self.image = history_surface(self.cells, self.w)
 
     def draw(self):
         screen.blit(self.image, (0, 0))
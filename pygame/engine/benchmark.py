@@ -0,0 +1,242 @@
+"""Headless benchmark runner for the projects built on the engine.
+
+Each game directory is benchmarked in its own Python process, since every
+project carries its own copy of engine.py. The child process selects the
+SDL dummy drivers, seeds the random number generators (NumPy's too, when
+it is installed), replaces run() so that importing main.py does not start
+the real game loop, and then drives update() and draw() itself for a
+fixed number of frames while pressing keys from an input script. The
+script is a stream of [frame, action, name] entries, as recorded by the
+engine's keyboard.start_recording().
+
+    python benchmark.py                      - benchmark every project
+    python benchmark.py brikz cave racer     - benchmark selected projects
+    python benchmark.py --frames 300 --output results.json
+    python benchmark.py --script recording.json brikz
+
+Results are written as a JSON table keyed by project name, holding frames
+per second, mean and p99 frame time in milliseconds, and the peak
+resident memory of the process in kilobytes.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import resource
+import subprocess
+import importlib.util
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PYGAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FRAMES = 600
+DEFAULT_SEED = 1
+DEFAULT_OUTPUT = 'benchmark.json'
+TIMEOUT = 600
+
+# a key is pressed on the listed frame of every cycle of SCRIPT_LENGTH
+# frames - enough to get past title screens and move the player around
+SCRIPT_LENGTH = 120
+DEFAULT_SCRIPT = {0: ['space'], 10: ['right'], 11: ['right'], 12: ['right'],
+                  40: ['left'], 41: ['left'], 42: ['left'], 60: ['up', 'space'],
+                  80: ['down'], 100: ['space', 'x', 'z']}
+
+
+def find_games():
+    """Return the names of all project directories with an engine and a main script."""
+
+    games = []
+    for entry in sorted(os.listdir(PYGAME_DIR)):
+        path = os.path.join(PYGAME_DIR, entry)
+        if (entry != 'engine' and
+            os.path.isfile(os.path.join(path, 'engine.py')) and
+            os.path.isfile(os.path.join(path, 'main.py'))):
+            games.append(entry)
+    return games
+
+
+def percentile(values, fraction):
+    """Return the value at the given fraction of the sorted values."""
+
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def default_stream(frames):
+    """Return the default script as a stream of key taps covering all frames."""
+
+    stream = []
+    for frame in range(frames):
+        for name in DEFAULT_SCRIPT.get(frame % SCRIPT_LENGTH, []):
+            stream.append([frame, 'press', name])
+            stream.append([frame, 'release', name])
+    return stream
+
+
+def keys_down(stream):
+    """Return the keys down on each frame of a stream, including taps.
+
+    Older engine copies clear every keyboard flag each frame, so held keys
+    have to be set again on every frame for them.
+    """
+
+    by_frame = {}
+    for frame, action, name in stream:
+        by_frame.setdefault(frame, []).append((action, name))
+
+    frames = {}
+    held = set()
+    for frame in range(max(by_frame, default=-1) + 1):
+        current = set(held)
+        pressed = set()
+        for action, name in by_frame.get(frame, []):
+            if action == 'press':
+                held.add(name)
+                current.add(name)
+                pressed.add(name)
+            else:
+                held.discard(name)
+                if name not in pressed:
+                    current.discard(name)
+        if current:
+            frames[frame] = current
+    return frames
+
+
+def benchmark_game(game, frames=DEFAULT_FRAMES, seed=DEFAULT_SEED, stream=None):
+    """Import one project and time its update() and draw() for a number of frames.
+
+    This changes the working directory and imports the project's own engine,
+    so it is meant to run in a fresh process - see run_child().
+    """
+
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    random.seed(seed)
+    if np is not None:
+        np.random.seed(seed)
+
+    path = os.path.join(PYGAME_DIR, game)
+    os.chdir(path)
+    sys.path.insert(0, path)
+
+    import engine
+    run_options = {}
+    engine.run = lambda *args, **kwargs: run_options.update(kwargs)
+
+    spec = importlib.util.spec_from_file_location('__main__', os.path.join(path, 'main.py'))
+    main = importlib.util.module_from_spec(spec)
+    sys.modules['__main__'] = main
+    spec.loader.exec_module(main)
+
+    main.screen = engine.Screen(main.WIDTH, main.HEIGHT)
+    draw = run_options.get('draw', True)
+    if not draw:
+        main.screen.fill((255,255,255))
+        main.setup()
+
+    up = main.update
+    if up.__code__.co_argcount == 0:
+        update = lambda dt: up()
+    else:
+        update = lambda dt: up(dt)
+
+    if stream is None:
+        stream = default_stream(frames)
+    playback = hasattr(engine.keyboard, 'play')
+    if playback:
+        engine.keyboard.play(stream)
+    else:
+        legacy_keys = keys_down(stream)
+
+    frame_times = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        if not playback:
+            for name in legacy_keys.get(frame, []):
+                setattr(engine.keyboard, name, True)
+        if draw:
+            main.screen.fill((255,255,255))
+        update(1/60)
+        if draw:
+            main.draw()
+        engine.pygame.display.update()
+        engine.keyboard.reset()
+        frame_times.append((time.perf_counter() - start) * 1000)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    total = sum(frame_times)
+    return {'frames': frames,
+            'fps': round(frames / (total / 1000), 1),
+            'mean_ms': round(total / frames, 3),
+            'p99_ms': round(percentile(frame_times, 0.99), 3),
+            'peak_kb': peak}
+
+
+def run_child(game, frames, seed, script):
+    """Benchmark a game in a subprocess and return its results or an error."""
+
+    command = [sys.executable, os.path.abspath(__file__), '--child', game,
+               '--frames', str(frames), '--seed', str(seed)]
+    if script:
+        command += ['--script', os.path.abspath(script)]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return {'error': f"timed out after {TIMEOUT}s"}
+
+    for line in reversed(result.stdout.splitlines()):
+        if line.startswith('{'):
+            return json.loads(line)
+
+    lines = result.stderr.strip().splitlines()
+    return {'error': lines[-1] if lines else f"exit status {result.returncode}"}
+
+
+def parse_args(args):
+    """Split command line arguments into options and game names."""
+
+    options = {'frames': DEFAULT_FRAMES, 'seed': DEFAULT_SEED,
+               'output': DEFAULT_OUTPUT, 'child': None, 'script': None}
+    games = []
+    while args:
+        arg = args.pop(0)
+        if arg in ('--frames', '--seed'):
+            options[arg[2:]] = int(args.pop(0))
+        elif arg in ('--output', '--child', '--script'):
+            options[arg[2:]] = args.pop(0)
+        else:
+            games.append(arg)
+    return options, games
+
+
+def main(args):
+    options, games = parse_args(args)
+
+    if options['child']:
+        stream = None
+        if options['script']:
+            with open(options['script']) as infile:
+                stream = json.load(infile)
+        results = benchmark_game(options['child'], options['frames'], options['seed'], stream)
+        print(json.dumps(results))
+        return
+
+    results = {}
+    for game in games or find_games():
+        results[game] = run_child(game, options['frames'], options['seed'], options['script'])
+        print(f"{game:14} {results[game]}")
+
+    with open(options['output'], 'w') as outfile:
+        json.dump(results, outfile, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
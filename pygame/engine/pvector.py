@@ -1,12 +1,21 @@
 import math
 from random import uniform
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 class PVector:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
 
     # instance methods ----------------------------
+    # the math operators mutate the vector in place and return it, so they
+    # can be chained or used as +=, -=, *= and /= without allocating
     def __repr__(self):
         return f"({self.x}, {self.y})"
 
@@ -16,22 +25,38 @@ class PVector:
     def __add__(self, other):
         self.x += other.x
         self.y += other.y
+        return self
 
     def __sub__(self, other):
         self.x -= other.x
         self.y -= other.y
+        return self
 
     def __mul__(self, scalar):
         self.x *= scalar
         self.y *= scalar
+        return self
 
     def __truediv__(self, scalar):
         self.x /= scalar
         self.y /= scalar
+        return self
+
+    __iadd__ = __add__
+    __isub__ = __sub__
+    __imul__ = __mul__
+    __itruediv__ = __truediv__
 
     def __eq__(self, other):
+        if not isinstance(other, PVector):
+            return NotImplemented
         return self.x == other.x and self.y == other.y
 
+    def set(self, x, y):
+        self.x = x
+        self.y = y
+        return self
+
     def dot(self, other):
         return (self.x * other.x) + (self.y * other.y)
 
@@ -43,13 +68,18 @@ class PVector:
         return math.acos(dot / (self.mag() * other.mag()))
 
     def mag(self):
-        return math.sqrt(self.x ** 2 + self.y ** 2)
+        return math.hypot(self.x, self.y)
+
+    def mag_sq(self):
+        return self.x * self.x + self.y * self.y
 
     def limit(self, max_):
-        m = self.mag()
-        if m > max_:
-            self / m
-            self * max_
+        m_sq = self.x * self.x + self.y * self.y
+        if m_sq > max_ * max_:
+            scale = max_ / math.sqrt(m_sq)
+            self.x *= scale
+            self.y *= scale
+        return self
 
     def copy(self):
         return PVector(self.x, self.y)
@@ -58,9 +88,14 @@ class PVector:
         return math.degrees(math.atan2(self.y, self.x))
 
     def set_mag(self, m):
-        p = self.normalize()
-        p * m
-        self.x, self.y = p.x, p.y
+        current = self.mag()
+        if current == 0:
+            self.x, self.y = 0, 0
+        else:
+            scale = m / current
+            self.x *= scale
+            self.y *= scale
+        return self
 
     def rotate(self, degrees):
         r = math.sqrt(self.x ** 2 + self.y ** 2)
@@ -103,6 +138,134 @@ class PVector:
         return PVector(uniform(-1,1), uniform(-1,1)).normalize()
 
     def dist(a, b):
-        m = b.x - a.x
-        n = b.y - a.y
-        return math.sqrt(m ** 2 + n ** 2)
+        return math.hypot(b.x - a.x, b.y - a.y)
+
+
+class VectorArray:
+    """N two dimensional vectors held in one NumPy array, with the PVector operations.
+
+    The math operators work on every vector at once and, like PVector's,
+    mutate in place and return the array. The other operand can be another
+    VectorArray, a single PVector applied to every row, a scalar, or an array
+    of N scalars (one per vector). Requires NumPy.
+    """
+
+    __slots__ = ('xy',)
+
+    def __init__(self, count=0, xy=None):
+        if np is None:
+            raise ImportError("VectorArray requires numpy")
+        if xy is None:
+            self.xy = np.zeros((count, 2))
+        else:
+            self.xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+
+    @staticmethod
+    def from_vectors(vectors):
+        return VectorArray(xy=[(v.x, v.y) for v in vectors])
+
+    def to_vectors(self):
+        return [PVector(x, y) for x, y in self.xy.tolist()]
+
+    # instance methods ----------------------------
+    def __repr__(self):
+        return f"VectorArray({self.xy.tolist()})"
+
+    def __len__(self):
+        return len(self.xy)
+
+    def __getitem__(self, i):
+        x, y = self.xy[i]
+        return PVector(float(x), float(y))
+
+    def __setitem__(self, i, v):
+        self.xy[i] = (v.x, v.y)
+
+    @property
+    def x(self):
+        return self.xy[:, 0]
+
+    @property
+    def y(self):
+        return self.xy[:, 1]
+
+    def _operand(self, other):
+        if isinstance(other, VectorArray):
+            return other.xy
+        if isinstance(other, PVector):
+            return (other.x, other.y)
+        other = np.asarray(other, dtype=float)
+        if other.ndim == 1 and len(other) == len(self.xy):
+            return other[:, np.newaxis]
+        return other
+
+    def __add__(self, other):
+        self.xy += self._operand(other)
+        return self
+
+    def __sub__(self, other):
+        self.xy -= self._operand(other)
+        return self
+
+    def __mul__(self, scalar):
+        self.xy *= self._operand(scalar)
+        return self
+
+    def __truediv__(self, scalar):
+        self.xy /= self._operand(scalar)
+        return self
+
+    __iadd__ = __add__
+    __isub__ = __sub__
+    __imul__ = __mul__
+    __itruediv__ = __truediv__
+
+    def dot(self, other):
+        return np.sum(self.xy * self._operand(other), axis=1)
+
+    def mag(self):
+        return np.hypot(self.xy[:, 0], self.xy[:, 1])
+
+    def mag_sq(self):
+        return np.einsum('ij,ij->i', self.xy, self.xy)
+
+    def limit(self, max_):
+        m = self.mag()
+        over = m > max_
+        self.xy[over] *= (max_ / m[over])[:, np.newaxis]
+        return self
+
+    def copy(self):
+        return VectorArray(xy=self.xy.copy())
+
+    def heading(self):
+        return np.degrees(np.arctan2(self.xy[:, 1], self.xy[:, 0]))
+
+    def set_mag(self, m):
+        current = self.mag()
+        scale = np.divide(m, current, out=np.zeros_like(current), where=current != 0)
+        self.xy *= scale[:, np.newaxis]
+        return self
+
+    # class methods -------------------------------
+    def add(v, u):
+        return v.copy() + u
+
+    def sub(v, u):
+        return v.copy() - u
+
+    def mult(v, scalar):
+        return v.copy() * scalar
+
+    def div(v, scalar):
+        return v.copy() / scalar
+
+    def normalize(v):
+        return v.copy().set_mag(1)
+
+    def random2D(count):
+        return VectorArray(xy=np.random.uniform(-1, 1, (count, 2))).set_mag(1)
+
+    def dist(a, b):
+        d = a._operand(b) - a.xy
+        return np.hypot(d[..., 0], d[..., 1])
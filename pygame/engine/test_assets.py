@@ -0,0 +1,70 @@
+import unittest
+import pygame
+from engine import Actor, Assets, AssetGroup, _image_assets, images, memory_report
+
+class AssetsTestCase(unittest.TestCase):
+    def test_index_is_built_once(self):
+        assets = Assets('./images/', ('png', 'jpg', 'gif'), pygame.image.load)
+        index = assets.index
+        self.assertIs(assets.index, index)
+        self.assertIn('box', assets)
+        self.assertIn('test', assets)
+        self.assertNotIn('missing', assets)
+
+    def test_extension_precedence(self):
+        assets = Assets('./images/', ('gif', 'jpg'), pygame.image.load)
+        self.assertEqual(assets.index['test'], 'test.jpg')
+        self.assertNotIn('box', assets)
+
+    def test_missing_directory(self):
+        assets = Assets('./no_such_directory/', ('png',), pygame.image.load)
+        self.assertEqual(assets.names(), [])
+
+    def test_least_recently_used_eviction(self):
+        assets = Assets('./images/', ('png', 'jpg', 'gif'), pygame.image.load, cache_size=2)
+        box = assets.load('box')
+        assets.load('blank')
+        self.assertIs(assets.load('box'), box)
+        assets.load('big_box')
+        self.assertEqual(list(assets._cache), ['box', 'big_box'])
+
+    def test_actors_share_surfaces(self):
+        a = Actor('box', (100,100))
+        b = Actor('box', (200,200))
+        self.assertIs(a._image, b._image)
+        self.assertIs(a._image, _image_assets.load('box'))
+        self.assertIs(images.box, a._image)
+
+
+class AssetGroupTestCase(unittest.TestCase):
+    def setUp(self):
+        self.assets = Assets('./images/', ('png', 'jpg', 'gif'), pygame.image.load,
+                             sizer=lambda surface: surface.get_pitch() * surface.get_height())
+
+    def test_files_load_on_first_access(self):
+        group = AssetGroup(self.assets)
+        self.assertFalse(self.assets.is_loaded('box'))
+        self.assertIs(group.box, self.assets.load('box'))
+        self.assertTrue(self.assets.is_loaded('box'))
+        self.assertFalse(self.assets.is_loaded('blank'))
+        self.assertRaises(AttributeError, getattr, group, 'missing')
+
+    def test_preload_manifest(self):
+        self.assets.preload(['box', 'missing'])
+        self.assertEqual(list(self.assets._cache), ['box'])
+
+    def test_background_preload(self):
+        thread = AssetGroup(self.assets).preload(['box', 'blank'])
+        thread.join()
+        self.assertTrue(self.assets.is_loaded('box'))
+        self.assertTrue(self.assets.is_loaded('blank'))
+
+    def test_report(self):
+        self.assertEqual(self.assets.report()['bytes'], 0)
+        box = self.assets.load('box')
+        report = self.assets.report()
+        self.assertEqual(report['loaded'], 1)
+        self.assertEqual(report['bytes'], box.get_pitch() * box.get_height())
+
+    def test_missing_sounds_directory(self):
+        self.assertEqual(memory_report()['sounds']['files'], 0)
@@ -0,0 +1,63 @@
+import unittest
+import pygame
+from pygame import Rect
+from engine import DirtyRects, _merge_rects
+
+class MergeRectsTestCase(unittest.TestCase):
+    def test_disjoint_rects_are_kept(self):
+        rects = [Rect(0,0,10,10), Rect(20,20,10,10)]
+        self.assertEqual(_merge_rects(rects), rects)
+
+    def test_overlapping_rects_are_combined(self):
+        rects = [Rect(0,0,10,10), Rect(5,5,10,10), Rect(50,50,5,5)]
+        self.assertEqual(_merge_rects(rects), [Rect(0,0,15,15), Rect(50,50,5,5)])
+
+    def test_chained_overlaps_are_combined(self):
+        rects = [Rect(0,0,10,10), Rect(20,0,10,10), Rect(8,0,14,10)]
+        self.assertEqual(_merge_rects(rects), [Rect(0,0,30,10)])
+
+
+class DirtyRectsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.surface = pygame.Surface((100,100))
+        self.dirty = DirtyRects()
+
+    def test_disabled_records_nothing(self):
+        self.dirty.add(Rect(0,0,10,10))
+        self.assertEqual(self.dirty.rects, [])
+
+    def test_first_frame_updates_whole_screen(self):
+        self.dirty.start(self.surface)
+        self.assertEqual(self.dirty.flush(), [Rect(0,0,100,100)])
+
+    def test_previous_frame_is_erased_and_updated(self):
+        self.dirty.set_backdrop(self.surface, (0,0,255))
+        self.dirty.start(self.surface)
+        self.dirty.flush()
+        self.dirty.flush()
+
+        self.dirty.add(self.surface.fill((255,0,0), Rect(10,10,5,5)))
+        self.assertEqual(self.dirty.flush(), [Rect(10,10,5,5)])
+
+        self.dirty.erase(self.surface)
+        self.assertEqual(self.surface.get_at((12,12)), (0,0,255))
+        self.dirty.add(self.surface.fill((255,0,0), Rect(40,40,5,5)))
+        self.assertEqual(self.dirty.flush(), [Rect(10,10,5,5), Rect(40,40,5,5)])
+
+    def test_empty_rects_are_ignored(self):
+        self.dirty.start(self.surface)
+        self.dirty.flush()
+        self.dirty.add(Rect(10,10,0,0))
+        self.assertEqual(self.dirty.rects, [])
+
+    def test_screen_blits_records_each_rect(self):
+        import engine
+        sprite = pygame.Surface((4,4))
+        engine._dirty_rects.enabled = True
+        try:
+            engine._dirty_rects.rects = []
+            engine.screen.blits([(sprite, (0,0)), (sprite, (-2,-2))])
+            self.assertEqual(len(engine._dirty_rects.rects), 2)
+        finally:
+            engine._dirty_rects.enabled = False
+            engine._dirty_rects.rects = []
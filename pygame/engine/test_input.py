@@ -0,0 +1,149 @@
+import sys
+import types
+import unittest
+import pygame
+import engine
+from engine import Keyboard, Mouse
+
+class KeyboardTestCase(unittest.TestCase):
+    def setUp(self):
+        self.keyboard = Keyboard()
+
+    def test_flags_default_to_false(self):
+        self.assertFalse(self.keyboard.space)
+        self.assertFalse(self.keyboard['space'])
+
+    def test_press_and_hold(self):
+        self.keyboard.press('space')
+        self.assertTrue(self.keyboard.space)
+        self.assertTrue(self.keyboard.just_pressed('space'))
+
+        self.keyboard.reset()
+        self.assertTrue(self.keyboard['space'])
+        self.assertFalse(self.keyboard.just_pressed('space'))
+        self.assertEqual(self.keyboard.held, {'space'})
+
+    def test_release(self):
+        self.keyboard.press('left')
+        self.keyboard.reset()
+        self.keyboard.release('left')
+        self.assertFalse(self.keyboard.left)
+        self.assertTrue(self.keyboard.just_released('left'))
+
+        self.keyboard.reset()
+        self.assertFalse(self.keyboard.just_released('left'))
+        self.assertEqual(self.keyboard.released, set())
+
+    def test_tap_within_one_frame(self):
+        self.keyboard.press('x')
+        self.keyboard.release('x')
+        self.assertTrue(self.keyboard.x)
+        self.assertTrue(self.keyboard.just_pressed('x'))
+        self.keyboard.reset()
+        self.assertFalse(self.keyboard.x)
+
+    def test_repeated_press_is_not_a_new_edge(self):
+        self.keyboard.press('up')
+        self.keyboard.reset()
+        self.keyboard.press('up')
+        self.assertFalse(self.keyboard.just_pressed('up'))
+
+    def test_setting_a_flag(self):
+        self.keyboard.space = True
+        self.assertTrue(self.keyboard.just_pressed('space'))
+        self.keyboard.space = False
+        self.assertTrue(self.keyboard.just_released('space'))
+
+    def test_record_and_play(self):
+        self.keyboard.reset()
+        self.keyboard.start_recording()
+        self.keyboard.press('a')
+        self.keyboard.reset()
+        self.keyboard.reset()
+        self.keyboard.release('a')
+        stream = self.keyboard.stop_recording()
+        self.assertEqual(stream, [[0, 'press', 'a'], [2, 'release', 'a']])
+
+        other = Keyboard()
+        other.play(stream)
+        self.assertTrue(other.just_pressed('a'))
+        other.reset()
+        self.assertTrue(other.a)
+        other.reset()
+        self.assertTrue(other.just_released('a'))
+
+
+    def test_consumed_edges_come_back_for_draw(self):
+        self.keyboard.press('a')
+        self.keyboard.consume()
+        self.assertFalse(self.keyboard.just_pressed('a'))
+        self.assertTrue(self.keyboard.a)
+
+        self.keyboard.restore()
+        self.assertTrue(self.keyboard.just_pressed('a'))
+        self.keyboard.end_frame()
+        self.assertFalse(self.keyboard.just_pressed('a'))
+
+    def test_unconsumed_edges_carry_over(self):
+        self.keyboard.press('a')
+        self.keyboard.restore()
+        self.keyboard.end_frame()
+        self.assertTrue(self.keyboard.just_pressed('a'))
+        self.keyboard.consume()
+        self.keyboard.end_frame()
+        self.assertFalse(self.keyboard.just_pressed('a'))
+
+
+class RunLoopTestCase(unittest.TestCase):
+    # drives engine.run() with a stand in main module and scripted key taps
+    TAPS = 17
+
+    def setUp(self):
+        self.main = sys.modules['__main__']
+        self.presses = []
+        self.drawn = []
+        game = types.ModuleType('game')
+        game.WIDTH, game.HEIGHT, game.TITLE = 20, 20, 'test'
+        game.update = lambda: self.presses.append(engine.keyboard.just_pressed('space'))
+        game.draw = lambda: self.drawn.append(engine.keyboard.just_pressed('space'))
+        game.setup = lambda: None
+        sys.modules['__main__'] = game
+
+        engine.keyboard.reset()
+        engine.keyboard.play([[frame, action, 'space']
+                              for i in range(self.TAPS)
+                              for frame, action in ((i * 3 + 1, 'press'), (i * 3 + 2, 'release'))])
+
+    def tearDown(self):
+        sys.modules['__main__'] = self.main
+        engine.keyboard._playback.clear()
+        engine.keyboard.reset()
+        # run() quits pygame on exit
+        pygame.init()
+        engine.screen.__init__(1, 1)
+
+    def run_frames(self, steps, **options):
+        engine.run(steps=steps, **options)
+        self.assertEqual(sum(self.presses), self.TAPS)
+        self.assertGreaterEqual(sum(self.drawn), self.TAPS)
+
+    def test_headless(self):
+        self.run_frames(self.TAPS * 3 + 5, headless=True)
+        self.assertEqual(self.presses, self.drawn)
+
+    def test_timestep_slower_than_frames(self):
+        # about one update() every other frame
+        self.run_frames(self.TAPS * 3, timestep=1/30)
+
+    def test_timestep_faster_than_frames(self):
+        # about four updates a frame
+        self.run_frames(self.TAPS * 3 * 5, timestep=1/240)
+
+
+class MouseTestCase(unittest.TestCase):
+    def test_buttons(self):
+        mouse = Mouse()
+        mouse.press('left')
+        self.assertTrue(mouse.left)
+        self.assertFalse(mouse.right)
+        self.assertEqual(mouse.pos, (0,0))
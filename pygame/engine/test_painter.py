@@ -0,0 +1,77 @@
+import unittest
+import pygame
+from pygame import Color
+import engine
+from engine import Painter
+
+class PainterTextTestCase(unittest.TestCase):
+    def setUp(self):
+        self.painter = Painter(pygame.Surface((200,100)))
+
+    def test_rendered_text_is_cached(self):
+        first = self.painter.render_text("score", color=(255,0,0))
+        self.assertIs(self.painter.render_text("score", color=Color('red')), first)
+        self.assertIsNot(self.painter.render_text("score", color=(0,0,255)), first)
+        self.assertIsNot(self.painter.render_text("score", fontsize=40), first)
+        self.assertIsNot(self.painter.render_text("score", color=(255,0,0), antialias=False), first)
+
+    def test_fonts_are_loaded_once(self):
+        self.assertIs(self.painter.get_font(None, 30), self.painter.get_font(None, 30))
+        self.assertIsNot(self.painter.get_font(None, 30), self.painter.get_font(None, 31))
+
+    def test_set_font_changes_default(self):
+        small = self.painter.render_text("x")
+        self.painter.set_font(fontsize=48)
+        self.assertEqual(self.painter.fontsize, 48)
+        self.assertGreater(self.painter.render_text("x").get_height(), small.get_height())
+
+    def test_cache_is_bounded(self):
+        for i in range(engine.TEXT_CACHE_SIZE + 10):
+            self.painter.render_text(str(i))
+        self.assertEqual(len(self.painter._text_cache), engine.TEXT_CACHE_SIZE)
+
+    def test_text_requires_position(self):
+        self.assertRaises(Exception, self.painter.text, "x")
+
+
+class PainterAlphaTestCase(unittest.TestCase):
+    def setUp(self):
+        self.surface = pygame.Surface((100,100))
+        self.surface.fill((255,255,255))
+        self.painter = Painter(self.surface)
+
+    def test_translucent_circle_is_round_and_centered(self):
+        self.painter.circle(50, 50, 10, (255,0,0,128))
+        center = self.surface.get_at((50,50))
+        self.assertGreater(center.r, 250)
+        self.assertLess(center.g, 200)
+        self.assertEqual(self.surface.get_at((41,41)), (255,255,255))
+
+    def test_scratch_surfaces_are_reused(self):
+        self.painter.circle(20, 20, 8, (255,0,0,100))
+        self.painter.circle(60, 60, 8, (0,0,255,100))
+        self.painter.rect(10, 10, 17, 17, (0,255,0,100))
+        self.assertEqual(len(self.painter._scratch_pool), 1)
+
+    def test_translucent_rect_outline(self):
+        self.painter.rect(10, 10, 20, 20, (0,0,0,128), 1)
+        self.assertNotEqual(self.surface.get_at((10,10)), (255,255,255))
+        self.assertEqual(self.surface.get_at((20,20)), (255,255,255))
+
+    def test_batched_circles_share_one_layer(self):
+        self.painter.circles([(20,20), (25,20), (80,80)], 8, (255,0,0,128))
+        overlap = self.surface.get_at((22,20))
+        single = self.surface.get_at((14,20))
+        self.assertEqual(overlap, single)
+        self.assertNotEqual(self.surface.get_at((80,80)), (255,255,255))
+        self.assertEqual(self.surface.get_at((50,50)), (255,255,255))
+
+    def test_batched_rects(self):
+        self.painter.rects([(0,0,10,10), (50,50,10,10)], (0,0,255))
+        self.assertEqual(self.surface.get_at((5,5)), (0,0,255))
+        self.assertEqual(self.surface.get_at((55,55)), (0,0,255))
+        self.assertEqual(self.surface.get_at((30,30)), (255,255,255))
+
+    def test_empty_batches(self):
+        self.painter.circles([], 5, (0,0,0,10))
+        self.painter.rects([], (0,0,0))
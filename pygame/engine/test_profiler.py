@@ -0,0 +1,61 @@
+import unittest
+import json
+import os
+import tempfile
+import pygame
+from engine import Profiler
+
+class ProfilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.profiler = Profiler(size=3)
+        self.profiler.enabled = True
+
+    def record_frame(self):
+        self.profiler.begin_frame()
+        with self.profiler.timer('update'):
+            with self.profiler.timer('physics'):
+                pass
+        with self.profiler.timer('draw'):
+            pass
+        self.profiler.end_frame()
+
+    def test_disabled_records_nothing(self):
+        self.profiler.enabled = False
+        self.record_frame()
+        self.assertEqual(len(self.profiler.frames), 0)
+
+    def test_nested_sections(self):
+        self.record_frame()
+        frame = self.profiler.frames[0]
+        self.assertEqual(list(frame['sections']), ['update/physics', 'update', 'draw'])
+        self.assertGreaterEqual(frame['total'], frame['sections']['update'])
+
+    def test_ring_buffer(self):
+        for _ in range(5):
+            self.record_frame()
+        self.assertEqual(len(self.profiler.frames), 3)
+        self.assertEqual(self.profiler.frames[0]['frame'], 2)
+
+    def test_export_csv(self):
+        self.record_frame()
+        filename = os.path.join(tempfile.mkdtemp(), 'frames.csv')
+        self.profiler.export(filename)
+        with open(filename) as infile:
+            lines = infile.read().splitlines()
+        self.assertEqual(lines[0], 'frame,total,update/physics,update,draw')
+        self.assertEqual(len(lines), 2)
+
+    def test_export_trace(self):
+        self.record_frame()
+        filename = os.path.join(tempfile.mkdtemp(), 'frames.json')
+        self.profiler.export(filename)
+        with open(filename) as infile:
+            trace = json.load(infile)
+        names = [event['name'] for event in trace['traceEvents']]
+        self.assertEqual(names, ['frame 0', 'physics', 'update', 'draw'])
+
+    def test_draw_graph(self):
+        surface = pygame.Surface((100,100))
+        self.record_frame()
+        area = self.profiler.draw(surface)
+        self.assertEqual(area, pygame.Rect(0,40,1,60))
@@ -0,0 +1,57 @@
+import math
+import unittest
+import numpy as np
+from pvector import PVector, VectorArray
+
+class PVectorTestCase(unittest.TestCase):
+    def test_operators_mutate_and_return_self(self):
+        v = PVector(1, 2)
+        self.assertIs(v + PVector(1, 1), v)
+        self.assertEqual(v, PVector(2, 3))
+        v *= 2
+        v -= PVector(1, 1)
+        v /= 3
+        self.assertEqual(v, PVector(1, 5/3))
+
+    def test_slots(self):
+        self.assertRaises(AttributeError, setattr, PVector(0, 0), 'z', 1)
+
+    def test_limit_and_set_mag(self):
+        v = PVector(3, 4).limit(1)
+        self.assertAlmostEqual(v.mag(), 1)
+        self.assertEqual(PVector(0.3, 0.4).limit(1), PVector(0.3, 0.4))
+        self.assertAlmostEqual(PVector(3, 4).set_mag(10).x, 6)
+        self.assertEqual(PVector(0, 0).set_mag(10), PVector(0, 0))
+
+    def test_comparison_with_other_types(self):
+        self.assertFalse(PVector(0, 0) == None)
+
+
+class VectorArrayTestCase(unittest.TestCase):
+    def setUp(self):
+        self.vectors = [PVector(3, 4), PVector(0, 0), PVector(-1, 1)]
+        self.array = VectorArray.from_vectors(self.vectors)
+
+    def test_round_trip(self):
+        self.assertEqual(self.array.to_vectors(), self.vectors)
+        self.assertEqual(self.array[2], PVector(-1, 1))
+        self.assertEqual(len(self.array), 3)
+
+    def test_operators_match_pvector(self):
+        self.array += PVector(1, 1)
+        self.array *= [1, 2, 3]
+        self.array -= VectorArray(xy=[(1, 1)] * 3)
+        self.assertEqual(self.array.to_vectors(), [PVector(3, 4), PVector(1, 1), PVector(-1, 5)])
+
+    def test_mag_heading_dist(self):
+        np.testing.assert_allclose(self.array.mag(), [5, 0, math.sqrt(2)])
+        np.testing.assert_allclose(self.array.heading(), [v.heading() for v in self.vectors])
+        np.testing.assert_allclose(VectorArray.dist(self.array, PVector(0, 0)),
+                                   [PVector.dist(v, PVector(0, 0)) for v in self.vectors])
+
+    def test_limit_and_normalize(self):
+        limited = VectorArray.mult(self.array, 1).limit(1)
+        np.testing.assert_allclose(limited.mag(), [1, 0, 1])
+        self.assertEqual(self.array[0], PVector(3, 4))
+        np.testing.assert_allclose(VectorArray.normalize(self.array).mag(), [1, 0, 1])
+        np.testing.assert_allclose(VectorArray.random2D(10).mag(), np.ones(10))
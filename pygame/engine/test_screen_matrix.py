@@ -0,0 +1,88 @@
+import math
+import unittest
+import pygame
+import numpy as np
+import engine
+from pvector import PVector
+import screen_matrix
+from screen_matrix import ScreenMatrix
+
+class ScreenMatrixTestCase(unittest.TestCase):
+    def setUp(self):
+        self.sm = ScreenMatrix()
+        self.surface = engine.screen.surface
+
+    def tearDown(self):
+        engine.screen.surface = engine.screen.draw.surface = self.surface
+
+    def test_matches_rotating_points(self):
+        self.sm.translate(PVector(100, 50))
+        self.sm.rotate(math.pi / 2)
+        self.sm.translate(PVector(10, 0))
+
+        expected = PVector(5, 0)
+        expected.rotate(90)
+        expected + PVector(100, 60)
+        x, y = self.sm.transform_point(5, 0)
+        self.assertAlmostEqual(x, expected.x)
+        self.assertAlmostEqual(y, expected.y)
+
+    def test_transform_arrays(self):
+        self.sm.scale(2)
+        self.sm.translate(PVector(1, 1))
+        points = self.sm.transform([(0, 0), (1, 0), (0, 1)])
+        np.testing.assert_allclose(points, [(2, 2), (4, 2), (2, 4)])
+
+    def test_matrix_is_cached_until_changed(self):
+        first = self.sm.matrix
+        self.assertIs(self.sm.matrix, first)
+        self.sm.push_matrix()
+        self.assertIs(self.sm.matrix, first)
+        self.sm.rotate(1)
+        self.assertIsNot(self.sm.matrix, first)
+        self.sm.pop_matrix()
+        np.testing.assert_allclose(self.sm.matrix, np.identity(3))
+
+    def test_batched_lines_match_immediate_lines(self):
+        def tree(depth):
+            self.sm.draw_line((0, 0), (0, -20))
+            self.sm.translate(PVector(0, -20))
+            if depth:
+                for theta in (-0.5, 0.4):
+                    self.sm.push_matrix()
+                    self.sm.rotate(theta)
+                    tree(depth - 1)
+                    self.sm.pop_matrix()
+
+        surfaces = []
+        for batched, numpy in ((False, np), (True, np), (True, None)):
+            # without numpy, batches fall back to converting each line in Python
+            screen_matrix.np = numpy
+            engine.screen.surface = pygame.Surface((200, 200))
+            engine.screen.draw.surface = engine.screen.surface
+            engine.screen.surface.fill((255,255,255))
+            self.sm.reset()
+            self.sm.translate(PVector(100, 190))
+            if batched:
+                with self.sm.batch():
+                    tree(4)
+                    self.assertEqual(engine.screen.surface.get_at((100, 185)), (255,255,255))
+            else:
+                tree(4)
+            surfaces.append(pygame.image.tobytes(engine.screen.surface, 'RGB'))
+        screen_matrix.np = np
+
+        self.assertEqual(surfaces[0], surfaces[1])
+        self.assertEqual(surfaces[0], surfaces[2])
+
+    def test_polygons_need_no_numpy(self):
+        engine.screen.surface = engine.screen.draw.surface = pygame.Surface((20, 20))
+        screen_matrix.np = None
+        try:
+            self.sm.translate(PVector(5, 5))
+            self.sm.draw_polygon([(0, 0), (4, 0), (0, 4)], (255,0,0))
+            self.assertEqual(engine.screen.surface.get_at((6, 6)), (255,0,0))
+            with self.assertRaises(ImportError):
+                self.sm.transform([(0, 0)])
+        finally:
+            screen_matrix.np = np
@@ -0,0 +1,53 @@
+import gc
+import unittest
+from pygame import Rect
+import engine
+from engine import Actor, SpatialHash
+
+class SpatialHashTestCase(unittest.TestCase):
+    def setUp(self):
+        engine.spatial.clear()
+        self.a = Actor('box', (100,100))
+        self.b = Actor('box', (110,100))
+        self.c = Actor('box', (400,300))
+
+    def test_actors_register_when_positioned(self):
+        self.assertEqual(len(engine.spatial), 3)
+        self.assertIn(self.a, engine.spatial)
+
+    def test_actors_in_rect(self):
+        self.assertEqual(engine.spatial.actors_in_rect(Rect(85,85,5,5)), [self.a])
+        self.assertEqual(engine.spatial.actors_in_rect((0,0,10,10)), [])
+
+    def test_moving_updates_cells(self):
+        self.c.pos = (100,100)
+        self.assertIn(self.c, engine.spatial.actors_in_rect(Rect(95,95,2,2)))
+        self.c.x = 600
+        self.assertNotIn(self.c, engine.spatial.actors_in_rect(Rect(95,95,2,2)))
+        self.assertIn(self.c, engine.spatial.actors_in_rect(Rect(600,100,1,1)))
+
+    def test_actors_near(self):
+        near = engine.spatial.actors_near((100,100), 5)
+        self.assertEqual(set(near), {self.a, self.b})
+        self.assertEqual(engine.spatial.actors_near((400,500), 50), [])
+        self.assertEqual(engine.spatial.actors_near((400,500), 500)[-1:], [self.c])
+
+    def test_collisions(self):
+        self.assertEqual(engine.spatial.collisions(), [(self.a, self.b)])
+
+    def test_collide_groups(self):
+        pairs = engine.spatial.collide([self.a], [self.b, self.c])
+        self.assertEqual(pairs, [(self.a, self.b)])
+        self.assertEqual(engine.spatial.collide([self.a], [self.a]), [])
+
+    def test_removed_and_released_actors_drop_out(self):
+        engine.spatial.remove(self.a)
+        self.assertEqual(engine.spatial.actors_in_rect(Rect(85,85,5,5)), [])
+        del self.b
+        gc.collect()
+        self.assertEqual(len(engine.spatial), 1)
+
+    def test_actor_spanning_cells(self):
+        spatial = SpatialHash(cell_size=8)
+        spatial.move(self.a)
+        self.assertEqual(spatial.actors_in_rect(Rect(self.a.rect.bottomright, (1,1)).move(-2,-2)), [self.a])
@@ -0,0 +1,44 @@
+import unittest
+import pygame
+from engine import Transforms
+
+class TransformsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.surface = pygame.Surface((20,10))
+
+    def test_rotate_is_cached(self):
+        t = Transforms()
+        first = t.rotate(self.surface, 90)
+        self.assertIs(t.rotate(self.surface, 90), first)
+        self.assertEqual(first.get_size(), (10,20))
+        self.assertEqual((t.hits, t.misses), (1,1))
+        self.assertEqual(t.hit_rate, 0.5)
+
+    def test_angles_are_quantized(self):
+        t = Transforms(angle_step=5)
+        first = t.rotate(self.surface, 44)
+        self.assertIs(t.rotate(self.surface, 46), first)
+        self.assertIs(t.rotate(self.surface, 405), first)
+        self.assertIsNot(t.rotate(self.surface, 50), first)
+
+    def test_scale_is_cached(self):
+        t = Transforms()
+        first = t.scale(self.surface, (40.4, 20.2))
+        self.assertEqual(first.get_size(), (40,20))
+        self.assertIs(t.scale(self.surface, (40,20)), first)
+        self.assertIs(t.scale_by(self.surface, 2.001), first)
+
+    def test_cache_is_bounded_per_surface(self):
+        t = Transforms(cache_size=2)
+        t.rotate(self.surface, 0)
+        t.rotate(self.surface, 1)
+        t.rotate(self.surface, 2)
+        self.assertEqual(len(t._cache[self.surface]), 2)
+
+        other = pygame.Surface((5,5))
+        t.rotate(other, 0)
+        self.assertEqual(len(t._cache[other]), 1)
+        self.assertEqual(len(t._cache[self.surface]), 2)
+
+    def test_hit_rate_without_lookups(self):
+        self.assertEqual(Transforms().hit_rate, 0.0)